@@ -1,25 +1,23 @@
-import os
-import re
-import json
-import hashlib
-import datetime
-import requests
-import xml.etree.ElementTree as ET
+import sys
 
 # =========================
-# الإعدادات الأساسية
+# تقرير ar (مستقل): إعدادات فقط
 # =========================
-BOT = os.environ["TELEGRAM_BOT_TOKEN"]
-CHAT_ID = os.environ["TELEGRAM_CHAT_ID"]
-
-KSA_TZ = datetime.timezone(datetime.timedelta(hours=3))
-STATE_FILE = "state.json"
+# الدورة نفسها في report_profile.py ومشتركة مع تقرير main؛ هنا قواميس
+# أوسع (دول إضافية وإشارات بيطرية عامة) وعمر أطول، و Google News وحده.
 
 # =========================
 # إعدادات التشغيل
 # =========================
+PROFILE = "ar"  # مساحة هذا التقرير في مخزن الحالة المشترك
+SOURCES = ("Google",)
 MAX_ITEMS = 10
+REPORT_TITLE = "📄 تقرير رصد الأمراض الحيوانية (مستقل)"
 MAX_AGE_DAYS = 180
+STORY_WINDOW_DAYS = 7  # خبر يشبه قصة انرسلت خلال هذي المدة = نفس الحدث
+
+# وضع daemon: فترة استطلاع Google (الابتدائية، الأدنى، الأعلى) بالدقائق
+DAEMON_INTERVALS = {"Google": (30, 10, 120)}
 
 # الدول المستهدفة
 COUNTRY_KEYS = {
@@ -56,6 +54,9 @@ DISEASE_ABBR = {
     "fmd": "الحمّى القلاعية (FMD)",
     "h5n1": "إنفلونزا الطيور (H5N1)",
 }
+# إثراء المقال يرقي الاختصار للاسم الكامل لنفس المرض فقط (بالأفضلية)؛
+# rvf/ppr/fmd اسمها في التقرير هو نفس الاسم الكامل
+DISEASE_ABBR_FULL = {"h5n1": ["highly pathogenic avian influenza", "avian influenza"]}
 
 # كلمات سياق مرضي
 DISEASE_CONTEXT = [
@@ -65,286 +66,53 @@ DISEASE_CONTEXT = [
     "veterinary", "animal disease", "zoonotic"
 ]
 
-# المناطق الشائعة بالعربي
-REGION_AR = {
-    "riyadh": "الرياض",
-    "makkah": "مكة المكرمة",
-    "madinah": "المدينة المنورة",
-    "eastern province": "المنطقة الشرقية",
-    "qassim": "القصيم",
-    "asir": "عسير",
-    "tabuk": "تبوك",
-    "hail": "حائل",
-    "jazan": "جازان",
-    "najran": "نجران",
-    "al bahah": "الباحة",
-    "al jawf": "الجوف",
-    "northern borders": "الحدود الشمالية",
-    "khartoum": "الخرطوم",
-    "darfur": "دارفور",
-    "north darfur": "شمال دارفور",
-    "south darfur": "جنوب دارفور",
-    "central darfur": "وسط دارفور",
-    "oromia": "أوروميا",
-    "amhara": "أمهرا",
-    "addis ababa": "أديس أبابا",
-    "banadir": "بنادر",
-    "puntland": "بونتلاند",
-    "somaliland": "صوماليلاند",
-    "amman": "عمّان",
-    "irbid": "إربد",
-    "zarqa": "الزرقاء",
-    "aqaba": "العقبة",
-}
-
-GOOGLE_RSS = "https://news.google.com/rss/search?q={q}&hl=en&gl=US&ceid=US:en"
-
-# =========================
-# أدوات الوقت
-# =========================
-def now_ksa():
-    return datetime.datetime.now(tz=KSA_TZ)
-
-def now_ksa_str():
-    return now_ksa().strftime("%Y-%m-%d %H:%M") + " بتوقيت السعودية"
-
-# =========================
-# Telegram
-# =========================
-def tg_send(text: str):
-    url = f"https://api.telegram.org/bot{BOT}/sendMessage"
-    parts = [text[i:i+3500] for i in range(0, len(text), 3500)]
-
-    for part in parts:
-        r = requests.post(
-            url,
-            json={
-                "chat_id": CHAT_ID,
-                "text": part,
-                "disable_web_page_preview": True
-            },
-            timeout=30
-        )
-        r.raise_for_status()
-
-# =========================
-# حفظ الحالة
-# =========================
-def load_state():
-    try:
-        with open(STATE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {"seen": {}}
-
-def save_state(state):
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
-
-def make_sid(url, title):
-    raw = (url or "") + "|" + (title or "")
-    return hashlib.sha256(raw.encode()).hexdigest()[:16]
-
-# =========================
-# كشف البيانات
-# =========================
-def detect_country(text):
-    low = (text or "").lower()
-    for key, value in COUNTRY_KEYS.items():
-        if key in low:
-            return value
-    return None
-
-def detect_region(text, country_ar):
-    low = (text or "").lower()
-    for key, value in REGION_AR.items():
-        if key in low:
-            return value
-    return "داخل الدولة" if country_ar else "غير محدد"
-
-def detect_disease(text):
-    low = (text or "").lower()
-
-    # أولاً: أسماء كاملة
-    for key, value in DISEASE_FULL.items():
-        if key in low:
-            return value
-
-    # ثانيًا: اختصارات بشرط وجود سياق
-    has_context = any(ctx in low for ctx in DISEASE_CONTEXT)
-    if has_context:
-        for key, value in DISEASE_ABBR.items():
-            if re.search(rf"\b{key}\b", low):
-                return value
-
-    # ثالثًا: تنبيه بيطري عام إذا ظهر سياق مرضي واضح
-    generic_signals = [
-        "animal disease", "livestock disease", "animal health alert",
-        "veterinary outbreak", "veterinary alert", "zoonotic disease"
-    ]
-    if any(sig in low for sig in generic_signals):
-        return "تنبيه صحي بيطري عام"
-
-    return None
-
-def classify_item(title: str, desc: str) -> str:
-    low = f"{title} {desc}".lower()
-
-    if "outbreak" in low or "confirmed" in low or "cases" in low or "detected" in low:
-        return "🟥 تفشي/حالات"
-    if "ban" in low or "imports" in low or "import ban" in low or "suspend" in low:
-        return "🟦 قرار/منع استيراد"
-    if "study" in low or "investigation" in low or "characterization" in low or "research" in low:
-        return "🟩 دراسة/بحث"
-    return "🟨 خبر عام"
-
-# =========================
-# فلترة التاريخ
-# =========================
-def within_days(pub: str, days: int) -> bool:
-    if not pub:
-        return True
-
-    formats = [
-        "%a, %d %b %Y %H:%M:%S %Z",
-        "%Y-%m-%dT%H:%M:%SZ",
-    ]
-
-    for fmt in formats:
-        try:
-            dt = datetime.datetime.strptime(pub, fmt).replace(tzinfo=datetime.timezone.utc)
-            age = now_ksa() - dt.astimezone(KSA_TZ)
-            return age.days <= days
-        except Exception:
-            continue
-
-    return True
-
-# =========================
-# جلب Google News RSS
-# =========================
-def fetch_google(query):
-    url = GOOGLE_RSS.format(q=requests.utils.quote(query))
-    headers = {"User-Agent": "Mozilla/5.0"}
-
-    r = requests.get(url, timeout=45, headers=headers)
-    r.raise_for_status()
-
-    root = ET.fromstring(r.text)
-    items = []
-
-    for it in root.findall(".//item"):
-        items.append({
-            "source": "Google News",
-            "title": (it.findtext("title") or "").strip(),
-            "link": (it.findtext("link") or "").strip(),
-            "pub": (it.findtext("pubDate") or "").strip(),
-            "desc": (it.findtext("description") or "").strip(),
-        })
-
-    return items
-
-# =========================
-# البرنامج الرئيسي
-# =========================
-def main():
-    state = load_state()
-
-    # استعلامات متعددة لزيادة فرص الالتقاط
-    queries = [
-        '("rift valley fever" OR RVF OR "peste des petits ruminants" OR PPR OR "foot and mouth disease" OR FMD OR "avian influenza" OR H5N1 OR "lumpy skin disease" OR anthrax OR rabies) (Saudi Arabia OR Sudan OR Somalia OR Ethiopia OR Djibouti OR Jordan OR India)',
-        '("animal disease" OR "livestock disease" OR "animal health alert" OR "veterinary outbreak") (Saudi Arabia OR Sudan OR Somalia OR Ethiopia OR Djibouti OR Jordan OR India)',
-    ]
-
-    items = []
-    status_notes = []
-
-    for q in queries:
-        try:
-            items.extend(fetch_google(q))
-            status_notes.append("Google=OK")
-            break
-        except Exception as e:
-            status_notes.append(f"Google={type(e).__name__}")
-
-    if not items:
-        tg_send(
-            "⚠️ تعذر جلب الأخبار حالياً.\n"
-            f"🕒 {now_ksa_str()}\n"
-            f"حالة المصدر: {'؛ '.join(status_notes)}"
-        )
-        return
-
-    new_events = []
-
-    for it in items:
-        if not within_days(it.get("pub", ""), MAX_AGE_DAYS):
-            continue
-
-        blob = f"{it.get('title','')} {it.get('desc','')}"
-
-        disease = detect_disease(blob)
-        country = detect_country(blob)
-
-        if not disease or not country:
-            continue
-
-        region = detect_region(blob, country)
-        label = classify_item(it.get("title", ""), it.get("desc", ""))
-
-        sid = make_sid(it.get("link", ""), it.get("title", ""))
-        if sid in state["seen"]:
-            continue
-
-        state["seen"][sid] = {
-            "first_seen": now_ksa_str(),
-            "source": it["source"]
-        }
-
-        new_events.append({
-            "source": it["source"],
-            "label": label,
-            "disease": disease,
-            "country": country,
-            "region": region,
-            "title": it.get("title", ""),
-            "link": it.get("link", ""),
-        })
-
-        if len(new_events) >= MAX_ITEMS:
-            break
-
-    if not new_events:
-        tg_send(
-            "📄 تقرير رصد الأمراض الحيوانية (مستقل)\n"
-            f"🕒 {now_ksa_str()}\n"
-            "════════════════════\n"
-            "✅ لا توجد إشارات جديدة مطابقة حالياً.\n"
-            f"ℹ️ حالة المصدر: {'؛ '.join(status_notes)}"
-        )
-        save_state(state)
-        return
+# إشارات بيطرية عامة (بدون مرض محدد)
+GENERIC_SIGNALS = [
+    "animal disease", "livestock disease", "animal health alert",
+    "veterinary outbreak", "veterinary alert", "zoonotic disease"
+]
+GENERIC_DISEASE = "تنبيه صحي بيطري عام"
 
-    lines = [
-        "📄 تقرير رصد الأمراض الحيوانية (مستقل)",
-        f"🕒 {now_ksa_str()}",
-        "════════════════════",
-        f"عدد الإشارات الجديدة: {len(new_events)}",
-        f"ℹ️ حالة المصدر: {'؛ '.join(status_notes)}",
-        "════════════════════",
-    ]
+# قواعد التصنيف: أول قاعدة تنطبق (بالترتيب) هي التصنيف
+LABEL_RULES = [
+    ("🟥 تفشي/حالات", ["outbreak", "confirmed", "cases", "detected"]),
+    ("🟦 قرار/منع استيراد", ["ban", "imports", "import ban", "suspend"]),
+    ("🟩 دراسة/بحث", ["study", "investigation", "characterization", "research"]),
+]
+LABEL_DEFAULT = "🟨 خبر عام"
+
+# ترتيب الأحداث (event_scoring.py): درجة التصنيف وخطورة المرض
+LABEL_SCORE = {
+    "🟥 تفشي/حالات": 3,
+    "🟦 قرار/منع استيراد": 2,
+    "🟩 دراسة/بحث": 1,
+    LABEL_DEFAULT: 0,
+}
+DISEASE_SEVERITY = {
+    DISEASE_FULL["highly pathogenic avian influenza"]: 3,
+    DISEASE_ABBR["h5n1"]: 3,
+    DISEASE_FULL["rift valley fever"]: 3,
+    DISEASE_FULL["foot and mouth disease"]: 3,
+    DISEASE_FULL["avian influenza"]: 2,
+    DISEASE_FULL["peste des petits ruminants"]: 2,
+    DISEASE_FULL["lumpy skin disease"]: 2,
+    DISEASE_FULL["anthrax"]: 2,
+    DISEASE_FULL["rabies"]: 1,
+}
 
-    for i, e in enumerate(new_events, 1):
-        lines.append(
-            f"{i}) [{e['source']}] {e['label']}  🐾 {e['disease']}\n"
-            f"   🌍 الدولة: {e['country']}\n"
-            f"   📍 المنطقة: {e['region']}\n"
-            f"   📰 العنوان: {e['title']}\n"
-            f"   🔗 الرابط: {e['link']}"
-        )
+# شرائح البحث (query_planner.py): كل مجموعة × كل دولة، كلها تُجلب بالتوازي.
+# مجموعتا الأمراض مطابقتان لتقرير main فتُجلب مرة وحدة للتقريرين،
+# ومجموعة الإشارات العامة خاصة بهذا التقرير
+QUERY_COUNTRIES = ["Saudi Arabia", "Sudan", "Somalia", "Ethiopia", "Djibouti", "Jordan", "India"]
+DISEASE_QUERY_GROUPS = [
+    ["rift valley fever", "RVF", "peste des petits ruminants", "PPR",
+     "foot and mouth disease", "FMD", "lumpy skin disease"],
+    ["avian influenza", "H5N1", "anthrax", "rabies"],
+    ["animal disease", "livestock disease", "animal health alert", "veterinary outbreak"],
+]
 
-    tg_send("\n".join(lines))
-    save_state(state)
 
 if __name__ == "__main__":
-    main()
+    # تشغيل هذا التقرير وحده؛ الجدولة تستخدم runner.py لكل التقارير معاً
+    import runner
+    runner.cli(["--profiles", "animal_monitor_ar", *sys.argv[1:]])
@@ -0,0 +1,194 @@
+import time
+import sqlite3
+import threading
+from html.parser import HTMLParser
+from concurrent.futures import Future, wait
+
+import http_client
+from feeds import _start_daemon_workers
+from link_canon import strip_tracking
+
+# =========================
+# نص المقال الكامل (إثراء اختياري)
+# =========================
+# العنوان والمقتطف غالباً ما يذكرون المنطقة، فيطلع "داخل الدولة".
+# للأحداث المختارة للإرسال فقط نجلب صفحة المقال بعمال محدودين ووقت
+# إجمالي محدود (اللي ما يخلص يتخطى بدون ما يأخر الدورة)، نستخرج نص
+# الفقرات، وتقرير الكشف يعيد المنطقة والمرض عليه.
+# النص ينحفظ بالرابط الموحد (link_canon.strip_tracking، نفس مفتاح sid) في
+# ذاكرة LRU على القرص (SQLite) مشتركة بين التقارير والدورات: نفس المقال
+# ما ينجلب مرتين حتى لو وصل برابط عرض مختلف. الجلب نفسه برابط العرض.
+
+ARTICLE_CACHE_FILE = "article_cache.db"
+CACHE_CAPACITY = 2000        # مقالات محفوظة؛ الأقدم استخداماً ينحذف
+ENRICH_WORKERS = 6
+ENRICH_BUDGET_S = 20         # أقصى وقت للمرحلة كاملة في الدورة
+ARTICLE_TIMEOUT = (5, 10)
+MAX_ARTICLE_BYTES = 1_000_000
+MAX_TEXT_CHARS = 10_000
+MIN_PARAGRAPH_CHARS = 40     # أقصر من كذا غالباً قوائم وأزرار مو متن
+
+SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form"}
+TEXT_TAGS = {"p", "h1", "h2", "li"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url   TEXT PRIMARY KEY,
+    text  TEXT NOT NULL,         -- فاضي = الصفحة ما فيها نص (ما نعيد جلبها)
+    used  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_used ON articles (used);
+"""
+
+
+def cache_key(url):
+    return strip_tracking(url)
+
+
+class _TextParser(HTMLParser):
+    """نص الفقرات خارج القوائم والترويسات والسكربتات."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = []
+        self._skip = 0
+        self._buf = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag in TEXT_TAGS and not self._skip:
+            self._buf = []
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in TEXT_TAGS and self._buf is not None:
+            text = " ".join("".join(self._buf).split())
+            if len(text) >= MIN_PARAGRAPH_CHARS:
+                self.paragraphs.append(text)
+            self._buf = None
+
+    def handle_data(self, data):
+        if self._buf is not None and not self._skip:
+            self._buf.append(data)
+
+
+def extract_text(html):
+    parser = _TextParser()
+    parser.feed(html)
+    parser.close()
+    return "\n".join(parser.paragraphs)[:MAX_TEXT_CHARS]
+
+
+def fetch_article(url):
+    """نص المقال، أو "" إذا الصفحة مو HTML أو رفضت. خطأ الشبكة يرتفع (ما ينحفظ، ينجرب مرة ثانية)."""
+    r = http_client.get(url, timeout=ARTICLE_TIMEOUT, retries=0, stream=True)
+    try:
+        if not r.ok or "html" not in r.headers.get("Content-Type", ""):
+            return ""
+        body = bytearray()
+        for chunk in r.iter_content(64 * 1024):
+            body += chunk
+            if len(body) >= MAX_ARTICLE_BYTES:
+                break
+        # بدون charset صريح requests يفترض latin-1؛ أغلب المواقع utf-8
+        charset = r.encoding if "charset" in r.headers["Content-Type"].lower() else "utf-8"
+        return extract_text(body.decode(charset, errors="replace"))
+    finally:
+        r.close()
+
+
+class ArticleCache:
+    def __init__(self, path=ARTICLE_CACHE_FILE, capacity=CACHE_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self._db = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def get_many(self, urls, now=None):
+        """{رابط: نص} للموجود، ويحدث وقت الاستخدام (LRU)."""
+        now = now if now is not None else time.time()
+        keys = {}
+        for u in urls:
+            keys.setdefault(cache_key(u), []).append(u)
+        if not keys:
+            return {}
+        with self._lock, self.db:
+            marks = ",".join("?" * len(keys))
+            rows = self.db.execute(
+                f"SELECT url, text FROM articles WHERE url IN ({marks})", list(keys)
+            ).fetchall()
+            self.db.executemany("UPDATE articles SET used = ? WHERE url = ?", [(now, u) for u, _ in rows])
+        return {u: text for key, text in rows for u in keys[key]}
+
+    def put_many(self, texts, now=None):
+        now = now if now is not None else time.time()
+        if not texts:
+            return
+        with self._lock, self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO articles (url, text, used) VALUES (?, ?, ?)",
+                [(cache_key(u), t, now) for u, t in texts.items()],
+            )
+            self.db.execute(
+                "DELETE FROM articles WHERE url IN "
+                "(SELECT url FROM articles ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.capacity,),
+            )
+
+
+CACHE = ArticleCache()
+
+
+def article_texts(urls, metrics=None, cache=CACHE, budget_s=ENRICH_BUDGET_S):
+    """
+    {رابط: نص} للروابط: من الذاكرة أولاً، والباقي بالتوازي حتى budget_s.
+    الرابط اللي ما خلص أو فشل جلبه ما يرجع (ينجرب الدورة الجاية).
+    روابط بنفس الشكل الموحد تنجلب مرة وحدة.
+    """
+    urls = list(dict.fromkeys(u for u in urls if u))
+    texts = cache.get_many(urls)
+    missing = {}
+    for u in urls:
+        if u not in texts:
+            missing.setdefault(cache_key(u), []).append(u)
+    if metrics is not None:
+        metrics.incr("articles", len(texts), status="cached")
+    if not missing:
+        return texts
+
+    # عمال daemon (مثل الجلب): صفحة معلقة بعد المهلة ما تأخر خروج العملية
+    tasks = {key: (Future(), fetch_article, (same[0],)) for key, same in missing.items()}
+    _start_daemon_workers(list(tasks.values()), ENRICH_WORKERS)
+    futures = {task[0]: key for key, task in tasks.items()}
+    done, pending = wait(futures, timeout=budget_s)
+    for fut in pending:
+        fut.cancel()
+
+    fetched = {}
+    for fut in done:
+        try:
+            fetched[missing[futures[fut]][0]] = fut.result()
+        except Exception as e:
+            if metrics is not None:
+                metrics.incr("articles", status=type(e).__name__)
+    cache.put_many(fetched)
+    if metrics is not None:
+        metrics.incr("articles", len(fetched), status="fetched")
+        metrics.incr("articles", len(pending), status="timeout")
+    for url, text in fetched.items():
+        texts.update(dict.fromkeys(missing[cache_key(url)], text))
+    return texts
@@ -0,0 +1,244 @@
+"""
+تحميل تاريخ GDELT لفترة زمنية إلى الحالة (seen.bin + events.db) بدون إرسال.
+
+    python backfill.py --start 2026-08-01
+    python backfill.py --start 2026-09-01 --end 2026-10-01 --query '"lumpy skin disease" Ethiopia' --profiles main
+
+GDELT DOC 2.0 يبحث في آخر 3 شهور تقريباً فقط (GDELT_LOOKBACK_DAYS): نافذة
+أقدم ترجع فاضية دايماً، فبداية قبل هذا الحد مرفوضة بدل ما تنحسب "مكتملة".
+
+لكل استعلام (شريحة) تنقسم الفترة نوافذ (--window-hours) تُجلب بالتوازي
+(--workers) تحت محدد معدل مشترك (--rate طلب/ثانية). نافذة رجعت الحد الأقصى
+من GDELT تنقسم نصين حتى ما يضيع شيء. التقدم ينحفظ في نقطة استئناف،
+فالتشغيل المقطوع يكمل من مكانه بنفس الأمر.
+"""
+import sys
+import time
+import argparse
+import datetime
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import feeds
+import http_client
+import link_canon
+import runner
+from pubdate import timestamp
+from rate_limit import TokenBucket
+from report_profile import EVENTS, legacy_sid, make_sid
+from run_metrics import RunMetrics
+from state_store import atomic_write_json, open_store, read_json
+
+CHECKPOINT_FILE = "backfill_checkpoint.json"
+MAXRECORDS = 250       # أقصى ما يرجعه GDELT لكل طلب
+MIN_WINDOW_S = 3600    # نافذة وصلت الحد تنقسم نصين حتى ساعة
+ATTEMPTS = 3
+SAVE_EVERY = 10        # نوافذ مكتملة بين كل حفظ للحالة ونقطة الاستئناف
+GDELT_LOOKBACK_DAYS = 90   # نافذة بحث GDELT DOC 2.0 (آخر 3 شهور)
+METRICS = RunMetrics("backfill")
+
+
+def _utc(ts):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc)
+
+
+def _parse_day(text):
+    dt = datetime.datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=datetime.timezone.utc)
+    return int(dt.timestamp())
+
+
+def split_range(start, end, step):
+    """[(بداية، نهاية)] بالثواني، النهاية غير مشمولة."""
+    return [(t, min(t + step, end)) for t in range(start, end, step)]
+
+
+def covered(window, done):
+    """النافذة مكتملة إذا نوافذ done داخلها تغطيها كاملة (بعد التقسيم)."""
+    start, end = window
+    return sum(e - s for s, e in done if s >= start and e <= end) >= end - start
+
+
+def fetch_window(limiter, query, window):
+    start, end = window
+    params = feeds.gdelt_params(query, MAXRECORDS, _utc(start), _utc(end))
+    for attempt in range(ATTEMPTS):
+        METRICS.add_time("rate_wait", limiter.acquire(), source="GDELT")
+        t0 = time.perf_counter()
+        try:
+            r = http_client.get(feeds.GDELT_DOC, params=params, headers=feeds.GDELT_HEADERS)
+            return feeds.parse_gdelt(r, METRICS)
+        except Exception as e:
+            METRICS.incr("fetch_status", source="GDELT", status=type(e).__name__)
+            if attempt == ATTEMPTS - 1:
+                raise
+        finally:
+            METRICS.add_time("fetch", time.perf_counter() - t0, source="GDELT")
+
+
+def ingest(profiles, states, items):
+    """
+    نفس دوال الكشف في التقارير: الحدث المطابق ينعلّم كمرسل (حتى التشغيل
+    العادي ما يرسل التاريخ للقناة) وينكتب في events.db. ترجع عدد الأحداث.
+    """
+    total = 0
+    links = link_canon.resolve_links([it["link"] for it in items], METRICS)
+    for p in profiles:
+        state = states[p.name]
+        events = []
+        for it in items:
+            blob = f"{it['title']} {it['desc']}"
+            hits = p.matcher.scan(blob)
+            disease = p.detect_disease(blob, hits)
+            country = p.detect_country(blob, hits)
+            if not disease or not country:
+                continue
+            link, canonical = links.get(it["link"], ("", ""))
+            sid = make_sid(canonical, it["title"])
+            if sid in state["seen"] or legacy_sid(it["link"], it["title"]) in state["seen"]:
+                continue
+            state["seen"].add(sid)
+            events.append({
+                "source": it["source"],
+                "sources": [it["source"]],
+                "label": p.classify_item(it["title"], it["desc"], hits),
+                "disease": disease,
+                "country": country,
+                "region": p.detect_region(blob, country),
+                "title": it["title"],
+                "link": link,
+                "pub_ts": timestamp(it["pub_dt"]),
+                "sid": sid,
+            })
+        EVENTS.add(p.name, events)
+        METRICS.incr("events_new", len(events), profile=p.name)
+        total += len(events)
+    return total
+
+
+def default_queries(profiles):
+    """شرائح GDELT في التقارير المختارة (query_planner)، بدون تكرار."""
+    queries = []
+    for p in profiles:
+        for name, fn, *args in p.build_jobs():
+            if fn is feeds.fetch_gdelt and args[0] not in queries:
+                queries.append(args[0])
+    if not queries:
+        sys.exit("no GDELT job in the selected profiles; pass --query")
+    return queries
+
+
+def backfill(profiles, queries, start, end, window_s, workers, rate, checkpoint):
+    params = {"queries": queries, "start": start, "end": end, "window_s": window_s}
+    saved = read_json(checkpoint, None)
+    if saved is not None and saved["params"] != params:
+        sys.exit(f"{checkpoint} belongs to a different backfill; remove it to start over")
+    # لكل شريحة: النوافذ المكتملة
+    done = {q: {tuple(w) for w in ws} for q, ws in (saved or {}).get("done", {}).items()}
+    for q in queries:
+        done.setdefault(q, set())
+
+    windows = split_range(start, end, window_s)
+    todo = deque((q, w) for q in queries for w in windows if not covered(w, done[q]))
+    total = len(todo)
+    print(f"{total} windows to fetch ({len(queries) * len(windows) - total} already done)")
+
+    store = open_store(runner.STATE_FILE, runner.SEEN_FILE)
+    states = {p.name: p.load_state(store) for p in profiles}
+    link_canon.LINKS.load()
+
+    def save():
+        for p in profiles:
+            p.dump_state(states[p.name])
+        store.save()
+        link_canon.LINKS.save()
+        atomic_write_json(checkpoint, {"params": params, "done": {q: sorted(ws) for q, ws in done.items()}})
+
+    limiter = TokenBucket(rate)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    running = {}
+    failed = []
+    events = since_save = completed = empty = 0
+    try:
+        while todo or running:
+            # نوافذ قيد التنفيذ محدودة بعدد العمال: الذاكرة ما تكبر مع طول الفترة
+            while todo and len(running) < workers:
+                q, w = todo.popleft()
+                running[pool.submit(fetch_window, limiter, q, w)] = (q, w)
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                q, w = running.pop(fut)
+                try:
+                    items = fut.result()
+                except Exception as e:
+                    failed.append((q, w))
+                    print(f"  {_utc(w[0]):%Y-%m-%d %H:%M} failed: {type(e).__name__}: {e}")
+                    continue
+                if len(items) >= MAXRECORDS and w[1] - w[0] > MIN_WINDOW_S:
+                    mid = (w[0] + w[1]) // 2
+                    todo.extendleft([(q, (mid, w[1])), (q, (w[0], mid))])
+                    METRICS.incr("windows_split")
+                    continue
+                events += ingest(profiles, states, items)
+                done[q].add(w)
+                completed += 1
+                if items:
+                    METRICS.incr("windows_done")
+                else:
+                    # تنحسب مكتملة (ما تنعاد)، لكن تنعد لحالها في الملخص
+                    empty += 1
+                    METRICS.incr("windows_empty")
+                since_save += 1
+                if since_save >= SAVE_EVERY:
+                    save()
+                    since_save = 0
+                    print(f"  {_utc(w[0]):%Y-%m-%d}: {completed} windows, {events} events")
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        save()
+        METRICS.write(runner.METRICS_DIR)
+
+    print(
+        f"done: {events} new events, {completed - empty} windows with articles, "
+        f"{empty} empty, {len(failed)} failed"
+    )
+    if completed and empty == completed:
+        print("warning: every window came back empty; check the queries and the date range")
+    if failed:
+        print("rerun the same command to retry the failed windows")
+    return events, failed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--start", required=True, help="YYYY-MM-DD (UTC)")
+    ap.add_argument("--end", help="YYYY-MM-DD (UTC، غير مشمول؛ الافتراضي الآن)")
+    ap.add_argument("--query", action="append",
+                    help="استعلام GDELT، يتكرر (الافتراضي شرائح GDELT في التقارير)")
+    ap.add_argument("--profiles", default=",".join(runner.PROFILES))
+    ap.add_argument("--window-hours", type=int, default=24)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--rate", type=float, default=0.2,
+                    help="طلب/ثانية لكل العمال معاً (GDELT يطلب طلب كل 5 ثواني)")
+    ap.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    args = ap.parse_args(argv)
+
+    now = int(time.time())
+    start = _parse_day(args.start)
+    end = _parse_day(args.end) if args.end else now
+    earliest = now - GDELT_LOOKBACK_DAYS * 86400
+    if start < earliest:
+        ap.error(
+            f"--start {args.start} is outside GDELT's {GDELT_LOOKBACK_DAYS}-day search window; "
+            f"the earliest usable start is {_utc(earliest):%Y-%m-%d}"
+        )
+    if end <= start:
+        ap.error("--end must be after --start")
+    profiles = runner.load_profiles(args.profiles.split(","))
+    backfill(
+        profiles, args.query or default_queries(profiles), start, end,
+        args.window_hours * 3600, args.workers, args.rate, args.checkpoint,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+قياس أداء الجلب والكشف وإزالة التكرار على بيانات صناعية.
+
+    python benchmarks/bench_pipeline.py --sizes 1000,10000,100000 --lang both
+    python benchmarks/bench_pipeline.py --sizes 1000000 --module ar --no-memory
+
+البيانات تتولد كردود حقيقية: RSS (Google News، 100 خبر للشريحة) و JSON
+(GDELT artlist، 250 للشريحة)، وتتحلل بنفس دوال الجلب (iter_rss_items و
+parse_gdelt)، ثم تمر على دورة التقرير نفسها (ReportProfile.run_cycle) بحالة
+فارغة في مجلد مؤقت، بدون شبكة ولا إرسال.
+لكل (وحدة، لغة، حجم) يطبع: عناصر/ثانية للتحليل وللدورة، أعلى ذاكرة
+(tracemalloc)، وزمن كل مرحلة من مقاييس الدورة (detect، canonicalize، store...).
+البيانات ببذرة ثابتة، فالنتائج قابلة للمقارنة بين التعديلات.
+"""
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import datetime
+import tempfile
+import tracemalloc
+import email.utils
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main as main_cfg                      # noqa: E402
+import animal_monitor_ar as ar_cfg           # noqa: E402
+import report_profile                        # noqa: E402
+from feeds import GDELT_DOC, parse_gdelt                 # noqa: E402
+from gazetteer import GAZETTEER, read_entries            # noqa: E402
+from http_archive import _response                       # noqa: E402
+from pubdate import cutoff                               # noqa: E402
+from report_profile import ReportProfile                 # noqa: E402
+from rss_stream import CHUNK_SIZE, iter_rss_items        # noqa: E402
+from run_metrics import RunMetrics                       # noqa: E402
+from state_store import StateStore                       # noqa: E402
+
+PROFILES = {"main": ReportProfile(main_cfg), "ar": ReportProfile(ar_cfg)}
+for _p in PROFILES.values():
+    # القياس ما يرسل: التقرير يتبنى كامل والإرسال بس يتخطى
+    _p.tg_send = lambda *blocks, per_chat=None: None
+
+RSS_SHARD = 100       # Google News يرجع ~100 خبر للاستعلام
+GDELT_SHARD = 250     # أقصى maxrecords في GDELT
+
+FILLER_EN = (
+    "officials said the ministry reported farmers livestock cattle sheep goats camels "
+    "market region district village week month health authorities team samples "
+    "laboratory results control measures movement restrictions local media"
+).split()
+FILLER_AR = (
+    "وزارة الزراعة أعلنت المزارعين الماشية الأغنام الماعز الإبل السوق المنطقة "
+    "الأسبوع الشهر السلطات الصحية فريق عينات المختبر نتائج إجراءات قيود محلية"
+).split()
+PUBLISHERS = ["Reuters", "The Hindu", "Sudan Tribune", "Arab News", "Addis Standard"]
+
+
+def _pub(rng, fmt, now):
+    ts = now - rng.uniform(0, 240) * 86400   # جزء أقدم من MAX_AGE_DAYS عمداً
+    if fmt == "gdelt":
+        return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return email.utils.formatdate(ts, usegmt=True)
+
+
+def synthetic_items(n, profile, lang="en", seed=1):
+    """
+    تيار عناصر بكثافة كلمات قريبة من الواقع: ~35% فيها مرض، ~45% فيها دولة،
+    ~25% فيها منطقة، ~40% فيها كلمة سياق. lang="mixed": نص عربي مع مفاتيح إنجليزية.
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    cfg = profile.config
+    diseases = list(cfg.DISEASE_FULL) + list(cfg.DISEASE_ABBR)
+    countries = list(cfg.COUNTRY_KEYS)
+    regions = [names[1] for *_, names in read_entries(GAZETTEER.path)]   # أول اسم إنجليزي
+    context = list(cfg.DISEASE_CONTEXT)
+    filler = FILLER_AR if lang == "mixed" else FILLER_EN
+    stories = []
+
+    for i in range(n):
+        # بعض العناصر نسخ لقصص سابقة بصياغة مختلفة (مصادر متعددة)
+        if stories and rng.random() < 0.15:
+            base = rng.choice(stories).split()
+            rng.shuffle(base)
+            title = " ".join(base)
+        else:
+            words = rng.sample(filler, 6)
+            if rng.random() < 0.35:
+                words.insert(rng.randrange(len(words)), rng.choice(diseases))
+            if rng.random() < 0.45:
+                words.insert(rng.randrange(len(words)), rng.choice(countries).title())
+            if rng.random() < 0.40:
+                words.append(rng.choice(context))
+            title = " ".join(words)
+            stories.append(title)
+            if len(stories) > 500:
+                stories.pop(0)
+
+        desc_words = rng.sample(filler, 12)
+        if rng.random() < 0.25:
+            desc_words.append(rng.choice(regions))
+        fmt = "gdelt" if i % 3 == 0 else "rss"
+        yield {
+            "source": "GDELT" if fmt == "gdelt" else "Google News",
+            "title": f"{title} - {rng.choice(PUBLISHERS)}",
+            "link": f"https://example.org/{seed}/{i}",
+            "pub": _pub(rng, fmt, now),
+            "desc": " ".join(desc_words),
+        }
+
+
+def _rss(items):
+    parts = ['<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>bench</title>']
+    for it in items:
+        parts.append(
+            f"<item><title>{escape(it['title'])}</title><link>{escape(it['link'])}</link>"
+            f"<pubDate>{it['pub']}</pubDate><description>{escape(it['desc'])}</description></item>"
+        )
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+def _gdelt(items):
+    articles = [
+        {"url": it["link"], "title": it["title"], "seendate": it["pub"], "snippet": it["desc"],
+         "sourceCountry": "", "language": "English", "domain": "example.org"}
+        for it in items
+    ]
+    return json.dumps({"articles": articles}, ensure_ascii=False).encode("utf-8")
+
+
+def responses(n, profile, lang="en", seed=1):
+    """تيار (اسم الـjob، bytes): شرائح RSS و GDELT بنفس شكل ردود المصادر."""
+    batches = {"Google": [], "GDELT": []}
+    sizes = {"Google": RSS_SHARD, "GDELT": GDELT_SHARD}
+    encode = {"Google": _rss, "GDELT": _gdelt}
+    for it in synthetic_items(n, profile, lang, seed):
+        name = "GDELT" if it["source"] == "GDELT" else "Google"
+        batch = batches[name]
+        batch.append(it)
+        if len(batch) == sizes[name]:
+            yield name, encode[name](batch)
+            batch.clear()
+    for name, batch in batches.items():
+        if batch:
+            yield name, encode[name](batch)
+
+
+def parse(name, body, max_age_days, metrics):
+    """نفس تحليل fetch_google / fetch_gdelt على رد جاهز."""
+    if name == "GDELT":
+        r = _response(200, {"Content-Type": "application/json"}, body, GDELT_DOC)
+        return parse_gdelt(r, metrics)
+    oldest = cutoff(max_age_days)
+    chunks = (body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE))
+    return list(iter_rss_items(chunks, "Google News", is_recent=lambda pub_dt: pub_dt > oldest))
+
+
+def run_once(profile, n, lang, workdir):
+    """
+    تحليل كل الشرائح ثم دورة التقرير على نتائجها بحالة فارغة.
+    ترجع (زمن التحليل، زمن الدورة، عدد العناصر بعد التحليل).
+    """
+    parse_s = 0.0
+    results = []
+    metrics = RunMetrics("bench", hosts=False)
+    for name, body in responses(n, profile, lang):
+        # زمن التوليد خارج القياس
+        t0 = time.perf_counter()
+        results.append((name, parse(name, body, profile.max_age_days, metrics), "OK"))
+        parse_s += time.perf_counter() - t0
+
+    store = StateStore(os.path.join(workdir, "state.json"), os.path.join(workdir, "seen.bin")).load()
+    state = profile.load_state(store)
+    report_profile.EVENTS.close()
+    report_profile.EVENTS.path = os.path.join(workdir, f"events_{time.monotonic_ns()}.db")
+    t0 = time.perf_counter()
+    profile.run_cycle(state, results, quiet=True)
+    cycle_s = time.perf_counter() - t0
+    report_profile.EVENTS.close()
+    return parse_s, cycle_s, sum(len(items) for _, items, _ in results)
+
+
+def bench(mod_name, lang, n, memory=True):
+    profile = PROFILES[mod_name]
+    cwd = os.getcwd()
+    events_path = report_profile.EVENTS.path
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        # مقاييس الدورة والاشتراكات تنقرأ/تنكتب نسبة للمجلد الحالي
+        os.chdir(workdir)
+        try:
+            parse_s, cycle_s, parsed = run_once(profile, n, lang, workdir)
+            rec = profile.metrics.record()
+            peak = None
+            if memory:
+                tracemalloc.start()
+                run_once(profile, n, lang, workdir)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        finally:
+            os.chdir(cwd)
+            report_profile.EVENTS.path = events_path
+
+    stages = {
+        key.split('"')[1]: v * 1000
+        for key, v in rec["timings_s"].items() if key.startswith("stage{")
+    }
+    return {
+        "module": mod_name, "lang": lang, "items": n, "parsed": parsed,
+        "matched": rec["counters"].get("events_new", 0),
+        "parse_per_s": n / max(parse_s, 1e-9), "cycle_per_s": parsed / max(cycle_s, 1e-9),
+        "peak_mb": peak / 1e6 if peak is not None else None,
+        "stages_ms": {"parse": parse_s * 1000, **stages},
+    }
+
+
+def _print(r):
+    peak = f"{r['peak_mb']:.1f}MB" if r["peak_mb"] is not None else "-"
+    print(
+        f"{r['module']:<5} {r['lang']:<6} n={r['items']:<8} parsed={r['parsed']:<8} "
+        f"matched={r['matched']:<7} parse {r['parse_per_s']:>9.0f} items/s  "
+        f"cycle {r['cycle_per_s']:>9.0f} items/s  peak={peak}"
+    )
+    print("      " + "  ".join(f"{k}={v:.0f}ms" for k, v in r["stages_ms"].items()))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", default="1000,10000,100000",
+                    help="أحجام مفصولة بفواصل (حتى 1000000)")
+    ap.add_argument("--module", choices=["main", "ar", "both"], default="both")
+    ap.add_argument("--lang", choices=["en", "mixed", "both"], default="both")
+    ap.add_argument("--no-memory", action="store_true", help="تخطي قياس الذاكرة (أسرع للأحجام الكبيرة)")
+    args = ap.parse_args(argv)
+
+    mods = ["main", "ar"] if args.module == "both" else [args.module]
+    langs = ["en", "mixed"] if args.lang == "both" else [args.lang]
+    for n in (int(x) for x in args.sizes.split(",")):
+        for m in mods:
+            for lang in langs:
+                _print(bench(m, lang, n, memory=not args.no_memory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import time
+import heapq
+import itertools
+
+from pubdate import cutoff, timestamp
+
+# =========================
+# أحداث مؤجلة للدورة الجاية
+# =========================
+# كل حدث مطابق يدخل هنا بدرجته (event_scoring.py)، وكل دورة ترسل أعلى
+# MAX_ITEMS والباقي ينتظر الدورة الجاية بدل ما نعيد جلبه ومطابقته.
+# كومة محدودة الحجم: جذرها أسوأ عنصر، فالإضافة والطرد O(log n) والكومة
+# نفسها O(السعة) مهما كان عدد المرشحين. الحد للكومة فقط: الدورة
+# (report_profile) تحمل كل الأخبار المجلوبة وكل أحداثها الجديدة أصلاً
+# (للحفظ في events.db ولإضافة المصادر المؤكدة)، فذاكرة الدورة O(عدد الأخبار).
+
+BACKLOG_MAX = 200
+
+
+class Backlog:
+    """
+    الترتيب: الدرجة (أعلى = أهم) ثم الأقدم انتظاراً ثم ترتيب الإضافة.
+    عند الامتلاء يُطرد الأسوأ. العمر بتاريخ نشر الخبر (pub_ts) مو وقت
+    دخوله الانتظار: الخبر اللي صار أقدم من max_age_days (نفس حد الجلب،
+    pubdate.cutoff) ينحذف عند التحميل وقبل الاختيار، فما ينرسل خبر قديم.
+    """
+
+    def __init__(self, max_age_days, capacity=BACKLOG_MAX):
+        self.max_age_days = max_age_days
+        self.capacity = capacity
+        self._heap = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def events(self):
+        return [entry[-1] for entry in self._heap]
+
+    def push(self, event, score, queued=None):
+        """يرجع الحدث المطرود إذا امتلأت السعة، وإلا None."""
+        queued = int(queued if queued is not None else time.time())
+        entry = (score, -queued, -next(self._seq), event)
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, entry)
+            return None
+        if entry[:3] <= self._heap[0][:3]:
+            return event
+        return heapq.heapreplace(self._heap, entry)[-1]
+
+    def rescore(self, score):
+        """
+        score(event) -> رقم. الدرجة تتغير بعد الإضافة (مصادر مؤكدة جديدة،
+        قِدم الخبر)، فنعيد حسابها قبل الاختيار.
+        """
+        self._heap = [(score(e[-1]), *e[1:]) for e in self._heap]
+        heapq.heapify(self._heap)
+
+    def expire(self, now=None):
+        """يحذف الأحداث اللي تعدت العمر (أو بدون تاريخ) ويرجع عددها."""
+        oldest = timestamp(cutoff(self.max_age_days, now))
+        kept = [e for e in self._heap if (e[-1].get("pub_ts") or 0) > oldest]
+        dropped = len(self._heap) - len(kept)
+        if dropped:
+            self._heap = kept
+            heapq.heapify(self._heap)
+        return dropped
+
+    def pop(self, n, now=None):
+        """أفضل n حدث بالترتيب (بعد حذف القديم)، وتنحذف من الانتظار."""
+        self.expire(now)
+        best = heapq.nlargest(n, self._heap, key=lambda e: e[:3])
+        if best:
+            taken = {id(e) for e in best}
+            self._heap = [e for e in self._heap if id(e) not in taken]
+            heapq.heapify(self._heap)
+        return [e[-1] for e in best]
+
+    def load(self, entries, now=None):
+        """now: datetime بتوقيت UTC (None = الآن)، مثل pubdate.cutoff."""
+        oldest = timestamp(cutoff(self.max_age_days, now))
+        self._heap = []
+        for entry in entries or []:
+            # القديم ينحذف قبل الإضافة حتى ما يطرد حدث حديث من كومة ممتلئة
+            if (entry["event"].get("pub_ts") or 0) > oldest:
+                self.push(entry["event"], entry.get("score", 0), entry["queued"])
+        return self
+
+    def dump(self):
+        ordered = sorted(self._heap, key=lambda e: e[:3], reverse=True)
+        return [
+            {"score": score, "queued": -q, "event": ev}
+            for score, q, _, ev in ordered
+        ]
@@ -0,0 +1,55 @@
+import time
+
+# =========================
+# ترتيب الأحداث
+# =========================
+# بدل أول MAX_ITEMS حسب ترتيب الجلب (ProMED ثم GDELT ثم Google) كل حدث
+# ياخذ درجة، والأعلى درجة ينرسل أولاً — فسيل أخبار عامة من Google ما يطرد
+# تفشي مؤكد. الدرجة = مجموع موزون من:
+#   label    : التصنيف (تفشي > قرار > دراسة > عام)
+#   severity : خطورة المرض
+#   ksa      : الدولة هي المملكة
+#   recency  : حداثة الخبر (تنخفض للنص كل RECENCY_HALF_LIFE_DAYS)
+#   sources  : عدد المصادر المؤكدة الإضافية (حتى MAX_CORROBORATION)
+
+WEIGHTS = {
+    "label": 1.0,
+    "severity": 1.0,
+    "ksa": 2.0,
+    "recency": 1.5,
+    "sources": 1.0,
+}
+RECENCY_HALF_LIFE_DAYS = 7
+MAX_CORROBORATION = 3
+
+
+class EventScorer:
+    """
+    label_scores: {التصنيف: درجة}، severity: {اسم المرض المعروض: درجة}.
+    الحدث يحتاج label و disease و country و sources و pub_ts (epoch أو None).
+    """
+
+    def __init__(self, label_scores, severity, home_country, weights=WEIGHTS,
+                 half_life_days=RECENCY_HALF_LIFE_DAYS):
+        self.label_scores = label_scores
+        self.severity = severity
+        self.home_country = home_country
+        self.weights = weights
+        self.half_life = half_life_days * 86400
+
+    def recency(self, pub_ts, now=None):
+        # تاريخ غير معروف = بدون نقاط حداثة
+        if pub_ts is None:
+            return 0.0
+        age = max(0.0, (now if now is not None else time.time()) - pub_ts)
+        return 0.5 ** (age / self.half_life)
+
+    def __call__(self, event, now=None):
+        w = self.weights
+        return (
+            w["label"] * self.label_scores.get(event["label"], 0)
+            + w["severity"] * self.severity.get(event["disease"], 0)
+            + w["ksa"] * (event["country"] == self.home_country)
+            + w["recency"] * self.recency(event.get("pub_ts"), now)
+            + w["sources"] * min(len(event["sources"]) - 1, MAX_CORROBORATION)
+        )
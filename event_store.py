@@ -0,0 +1,155 @@
+"""
+سجل الأحداث المكتشفة (SQLite) للاتجاهات والملخصات.
+
+    python event_store.py count --disease FMD --country إثيوبيا --days 90
+    python event_store.py digest --days 7
+"""
+import sys
+import time
+import sqlite3
+import argparse
+
+# =========================
+# سجل الأحداث
+# =========================
+# seen.bin يحفظ sids مجزأة فقط؛ هنا نحفظ الحدث نفسه (المرض، الدولة، المنطقة،
+# التصنيف، المصادر، الوقت) حتى نجاوب أسئلة مثل "كم إشارة FMD من إثيوبيا
+# خلال 90 يوم" محلياً بدل إعادة الاستعلام من GDELT.
+# - فهرس (disease, country, ts) يخدم العد والاتجاهات لكل زوج (و sid فيه
+#   حتى يكون العد من الفهرس وحده).
+# - نفس الخبر عند تقريرين = صفين؛ العد بـ DISTINCT sid.
+# - كل دورة تكتب أحداثها في معاملة واحدة (executemany).
+
+EVENTS_FILE = "events.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    profile  TEXT    NOT NULL,
+    sid      TEXT    NOT NULL,
+    ts       INTEGER NOT NULL,   -- وقت النشر، أو وقت الاكتشاف إذا غير معروف
+    seen_ts  INTEGER NOT NULL,   -- وقت الاكتشاف
+    disease  TEXT    NOT NULL,
+    country  TEXT    NOT NULL,
+    region   TEXT,
+    label    TEXT,
+    source   TEXT,
+    sources  TEXT,               -- المصادر المؤكدة مفصولة بـ " + "
+    title    TEXT,
+    link     TEXT,
+    PRIMARY KEY (profile, sid)
+);
+CREATE INDEX IF NOT EXISTS events_disease_country_ts ON events (disease, country, ts, sid);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+"""
+
+
+class EventStore:
+    def __init__(self, path=EVENTS_FILE):
+        self.path = path
+        self._db = None
+
+    @property
+    def db(self):
+        # الاتصال يُفتح عند أول استخدام (الاستيراد ما يلمس القرص)
+        if self._db is None:
+            self._db = sqlite3.connect(self.path)
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def add(self, profile, events, now=None):
+        """events: أحداث حلقة الكشف (بـ sid و pub_ts). ترجع عدد الصفوف الجديدة."""
+        now = int(now if now is not None else time.time())
+        rows = [
+            (
+                profile, e["sid"], e.get("pub_ts") or now, now,
+                e["disease"], e["country"], e.get("region"), e.get("label"),
+                e.get("source"), " + ".join(e.get("sources") or []),
+                e.get("title"), e.get("link"),
+            )
+            for e in events
+        ]
+        if not rows:
+            return 0
+        with self.db:
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO events VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", rows
+            )
+            return self.db.total_changes - before
+
+    def count(self, disease, country=None, since=None, until=None):
+        sql = "SELECT COUNT(DISTINCT sid) FROM events WHERE disease = ?"
+        args = [disease]
+        if country is not None:
+            sql += " AND country = ?"
+            args.append(country)
+        sql, args = _time_range(sql, args, since, until)
+        return self.db.execute(sql, args).fetchone()[0]
+
+    def digest(self, since, until=None, limit=50):
+        """[(المرض، الدولة، العدد، آخر وقت)] مرتبة من الأكثر."""
+        sql = "SELECT disease, country, COUNT(DISTINCT sid) AS n, MAX(ts) FROM events WHERE 1"
+        sql, args = _time_range(sql, [], since, until)
+        sql += " GROUP BY disease, country ORDER BY n DESC, MAX(ts) DESC LIMIT ?"
+        return self.db.execute(sql, args + [limit]).fetchall()
+
+    def values(self, column):
+        if column not in ("disease", "country"):
+            raise ValueError(column)
+        return [r[0] for r in self.db.execute(f"SELECT DISTINCT {column} FROM events")]
+
+
+def _time_range(sql, args, since, until):
+    if since is not None:
+        sql += " AND ts >= ?"
+        args.append(int(since))
+    if until is not None:
+        sql += " AND ts < ?"
+        args.append(int(until))
+    return sql, args
+
+
+def _resolve(store, column, text):
+    """--disease FMD → القيمة المخزنة "الحمّى القلاعية (FMD)"."""
+    if text is None:
+        return []
+    found = [v for v in store.values(column) if text.lower() in v.lower()]
+    if not found:
+        sys.exit(f"no {column} matching {text!r}")
+    return found
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--db", default=EVENTS_FILE)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("count", help="عدد الإشارات لمرض (ودولة) خلال آخر N يوم")
+    c.add_argument("--disease", required=True, help="جزء من اسم المرض، مثل FMD")
+    c.add_argument("--country", help="جزء من اسم الدولة كما يظهر في التقرير")
+    c.add_argument("--days", type=int, default=90)
+    d = sub.add_parser("digest", help="ملخص الأزواج (مرض، دولة) خلال آخر N يوم")
+    d.add_argument("--days", type=int, default=7)
+    d.add_argument("--limit", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    store = EventStore(args.db)
+    since = time.time() - args.days * 86400
+    if args.cmd == "count":
+        countries = _resolve(store, "country", args.country) or [None]
+        for disease in _resolve(store, "disease", args.disease):
+            for country in countries:
+                n = store.count(disease, country, since)
+                print(f"{n:>6}  {disease}  {country or '*'}")
+    else:
+        for disease, country, n, last in store.digest(since, limit=args.limit):
+            day = time.strftime("%Y-%m-%d", time.gmtime(last))
+            print(f"{n:>6}  {disease}  {country}  (آخر: {day})")
+
+
+if __name__ == "__main__":
+    main()
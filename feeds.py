@@ -0,0 +1,334 @@
+import time
+import queue
+import threading
+import requests
+from collections import Counter
+from concurrent.futures import Future, wait
+
+import pubdate
+from http_cache import HttpCache, NotModified
+from rate_limit import TokenBucket
+from rss_stream import CHUNK_SIZE, iter_rss_items
+from source_health import HealthTracker
+
+# =========================
+# جلب المصادر (مشترك بين التقارير)
+# =========================
+# كل دوال الجلب تاخذ max_age_days (فلترة أثناء التحليل) و metrics (RunMetrics)
+# و timeout (مهلة القراءة من HEALTH، None = الافتراضي)،
+# فالمشغل المشترك يجلب كل رابط مرة وحدة بأكبر عمر مطلوب، وكل تقرير
+# يعيد الفلترة بعمره الخاص. كل عنصر يحمل pub_dt (pubdate.py) محلول مرة عند الجلب.
+# الدوال ترجع (items، validators)، و fetch_all يسجل ETag فقط للجلب اللي
+# خلص قبل المهلة وانقبلت أخباره.
+
+PROMED_RSS = "https://promedmail.org/promed-posts?format=rss"
+GDELT_DOC = "https://api.gdeltproject.org/api/v2/doc/doc"
+GOOGLE_RSS = "https://news.google.com/rss/search?q={q}&hl=en&gl=US&ceid=US:en"
+
+FETCH_DEADLINE = 60  # ثواني — مهلة واحدة لكل المصادر معاً
+FETCH_WORKERS = 16   # أقصى طلبات متزامنة (الشرائح كثيرة؛ المعدل يحدده LIMITS)
+HTTP_CACHE = HttpCache("http_cache.json")
+HEALTH = HealthTracker()   # صحة كل مصدر؛ المشغل يحفظها مع state.json
+
+# محدد معدل مشترك لكل مضيف بين كل الشرائح والتقارير (طلب/ثانية، دفعة)
+LIMITS = {
+    "GDELT": TokenBucket(0.2, burst=1),    # GDELT يطلب طلب كل 5 ثواني (بدون دفعة)
+    "Google": TokenBucket(4, burst=8),
+}
+
+
+# انتظار محدد المعدل في الجلب الحالي (لكل خيط): زمن الجلب للمهلة المتكيفة
+# يُحسب بدونه، فالمهلة تتبع سرعة السيرفر مو طابور الطلبات
+_job = threading.local()
+
+
+def _throttle(metrics, source):
+    waited = LIMITS[source].acquire()
+    metrics.add_time("rate_wait", waited, source=source)
+    _job.waited = getattr(_job, "waited", 0.0) + waited
+
+
+def _record_feed(metrics, source, stats):
+    metrics.incr("bytes_downloaded", stats["bytes"], source=source)
+    metrics.incr("items_parsed", stats["items"], source=source)
+    metrics.incr("items_dropped", stats["old"], reason="age", source=source)
+    metrics.incr("pub_unparseable", stats["bad_date"], source=source)
+    metrics.add_time("parse", stats["parse_s"], source=source)
+
+
+# ===== جلب ProMED (قد يفشل) =====
+def fetch_promed(*, max_age_days, metrics, timeout=None):
+    headers = {"User-Agent": "Mozilla/5.0"}
+    r = HTTP_CACHE.get(PROMED_RSS, headers=headers, stream=True, timeout=timeout)
+    with r:
+        r.raise_for_status()
+        # ProMED مرتبة من الأحدث: نوقف التحميل عند أول منشور أقدم من max_age_days
+        stats = {}
+        cutoff = pubdate.cutoff(max_age_days)
+        items = list(iter_rss_items(
+            r.iter_content(CHUNK_SIZE), "ProMED",
+            is_recent=lambda pub_dt: pub_dt > cutoff, sorted_desc=True, stats=stats,
+        ))
+    _record_feed(metrics, "ProMED", stats)
+    return items, HTTP_CACHE.validators(r)
+
+
+# ===== جلب Google News (fallback مضمون غالباً) =====
+def fetch_google(query, *, max_age_days, metrics, timeout=None):
+    url = GOOGLE_RSS.format(q=requests.utils.quote(query))
+    headers = {"User-Agent": "Mozilla/5.0"}
+    _throttle(metrics, "Google")
+    r = HTTP_CACHE.get(url, headers=headers, stream=True, timeout=timeout)
+    with r:
+        r.raise_for_status()
+        # نتائج البحث مرتبة حسب الصلة مو التاريخ — نتخطى القديم بدون توقف
+        stats = {}
+        cutoff = pubdate.cutoff(max_age_days)
+        items = list(iter_rss_items(
+            r.iter_content(CHUNK_SIZE), "Google News",
+            is_recent=lambda pub_dt: pub_dt > cutoff, stats=stats,
+        ))
+    _record_feed(metrics, "Google", stats)
+    return items, HTTP_CACHE.validators(r)
+
+
+# ===== جلب GDELT (مصمم ضد JSONDecodeError) =====
+GDELT_HEADERS = {"User-Agent": "Mozilla/5.0 (KSA-Animal-Health-Intel/1.0)"}
+
+
+def gdelt_params(query, maxrecords, start=None, end=None):
+    """start/end: datetime بتوقيت UTC لنافذة زمنية (backfill)."""
+    params = {
+        "query": query,
+        "mode": "artlist",
+        "format": "json",
+        "sort": "datedesc",
+        "maxrecords": str(maxrecords),
+    }
+    if start is not None:
+        params["startdatetime"] = start.strftime("%Y%m%d%H%M%S")
+    if end is not None:
+        params["enddatetime"] = end.strftime("%Y%m%d%H%M%S")
+    return params
+
+
+def fetch_gdelt(query, maxrecords=60, *, max_age_days, metrics, timeout=None):
+    # GDELT ما يُفلتر هنا (JSON صغير)؛ كل تقرير يفلتر بعمره
+    _throttle(metrics, "GDELT")
+    r = HTTP_CACHE.get(
+        GDELT_DOC, params=gdelt_params(query, maxrecords), headers=GDELT_HEADERS, timeout=timeout,
+    )
+    items = parse_gdelt(r, metrics)
+    return items, HTTP_CACHE.validators(r)
+
+
+def parse_gdelt(r, metrics):
+    # إذا GDELT رجّع HTML (حجب/Rate limit) بدال JSON
+    ctype = (r.headers.get("content-type") or "").lower()
+    text = (r.text or "").strip()
+
+    if r.status_code != 200:
+        raise requests.HTTPError(f"GDELT HTTP {r.status_code}", response=r)
+
+    if "application/json" not in ctype and not text.startswith("{"):
+        # هذا سبب JSONDecodeError عندك — نعطي خطأ مفهوم
+        raise ValueError("GDELT returned non-JSON (likely rate-limit/block)")
+
+    metrics.incr("bytes_downloaded", len(r.content), source="GDELT")
+    t0 = time.perf_counter()
+    data = r.json()
+    items = []
+    bad_date = 0
+    for a in data.get("articles", []) or []:
+        pub = (a.get("seendate") or "").strip()  # 20260228T000000Z
+        item = {
+            "source": "GDELT",
+            "title": (a.get("title") or "").strip(),
+            "link": (a.get("url") or "").strip(),
+            "pub": pub,
+            "pub_dt": pubdate.parse_pub(pub),
+            "desc": (a.get("snippet") or "") + " " + (a.get("sourceCountry") or ""),
+        }
+        if item["pub_dt"] is None:
+            bad_date += 1
+            continue
+        items.append(item)
+    metrics.add_time("parse", time.perf_counter() - t0, source="GDELT")
+    metrics.incr("items_parsed", len(items) + bad_date, source="GDELT")
+    metrics.incr("pub_unparseable", bad_date, source="GDELT")
+    return items
+
+
+# ===== جلب متوازي بمهلة واحدة =====
+def job_key(job):
+    """نفس الدالة بنفس المعاملات = نفس الرابط، يُجلب مرة وحدة."""
+    _, fn, *args = job
+    return (fn.__name__, *args)
+
+
+def fetch_all(jobs, max_age_days, metrics, deadline=FETCH_DEADLINE, health=None):
+    """
+    jobs: قائمة (الاسم، الدالة، *المعاملات).
+    ترجع [(الاسم، items أو None، الحالة)] بنفس ترتيب jobs مهما كان ترتيب الانتهاء.
+    الحالة: OK / NotModified / Timeout / CircuitOpen / اسم الاستثناء.
+    health: HealthTracker (الافتراضي HEALTH) — المصدر الواقف يتخطى بدون طلب.
+    """
+    if not jobs:
+        return []
+    health = HEALTH if health is None else health
+    ends_at = time.monotonic() + deadline
+    durations = {}
+
+    def run(i, name, fn, args):
+        _job.waited = 0.0
+        t0 = time.perf_counter()
+        try:
+            return _timed_fetch(
+                metrics, name, fn, *args, max_age_days=max_age_days, timeout=health.timeout(name),
+            )
+        finally:
+            # زمن السيرفر فقط: انتظار محدد المعدل ما يدخل المهلة المتكيفة
+            durations[i] = time.perf_counter() - t0 - _job.waited
+
+    def submit(indices):
+        tasks = {i: (Future(), run, (i, *jobs[i][:2], jobs[i][2:])) for i in indices}
+        _start_daemon_workers(list(tasks.values()), FETCH_WORKERS)
+        return {i: task[0] for i, task in tasks.items()}
+
+    # مصدر انتهى انتظاره: شريحة وحدة تجربة، وباقي شرائحه تنتظر نتيجتها؛
+    # المصادر الشغالة تنجلب بنفس الوقت
+    probes, held, ready = {}, [], []
+    for i, (name, *_) in enumerate(jobs):
+        if name in probes:
+            held.append(i)
+        elif health.start_probe(name):
+            probes[name] = i
+        elif health.allow(name):
+            ready.append(i)
+        else:
+            held.append(i)
+    futures = submit([*probes.values(), *ready])
+
+    outcomes = {}
+    if probes:
+        wait([futures[i] for i in probes.values()], timeout=max(0.0, ends_at - time.monotonic()))
+        for i in probes.values():
+            outcomes[i] = _outcome(jobs[i][0], futures.pop(i), durations.get(i), metrics, health)
+        # التجربة نجحت = كل شرائح المصدر في نفس الدورة (بدل شريحة كل تشغيل)
+        retry = [i for i in held if health.allow(jobs[i][0])]
+        futures.update(submit(retry))
+        held = [i for i in held if i not in futures]
+    for i in held:
+        metrics.incr("fetch_status", source=jobs[i][0], status="CircuitOpen")
+        outcomes[i] = (None, "CircuitOpen")
+
+    wait(list(futures.values()), timeout=max(0.0, ends_at - time.monotonic()))
+    # لا ننتظر المصادر المتأخرة — التقرير يطلع في موعده، واللي ما بدأ يُلغى
+    for fut in futures.values():
+        fut.cancel()
+    for i, fut in futures.items():
+        outcomes[i] = _outcome(jobs[i][0], fut, durations.get(i), metrics, health)
+    return [(name, *outcomes[i]) for i, (name, *_) in enumerate(jobs)]
+
+
+def _outcome(name, fut, duration, metrics, health):
+    """(items أو None، الحالة) لجلب انتهى أو تأخر، ويسجلها في health."""
+    if not fut.done():
+        fut.cancel()
+        metrics.incr("fetch_status", source=name, status="Timeout")
+        status, items = "Timeout", None
+    else:
+        exc = fut.exception()
+        if isinstance(exc, NotModified):
+            status, items = "NotModified", []
+        elif exc is not None:
+            status, items = type(exc).__name__, None
+        else:
+            status = "OK"
+            items, validators = fut.result()
+            # الأخبار انقبلت، فالطلب الجاي يقدر ياخذ 304
+            HTTP_CACHE.remember(validators)
+    # زمن 304 أقصر من أي تحميل كامل، فما يدخل حساب المهلة
+    if health.record(name, fetched_ok(status), duration if status == "OK" else None):
+        metrics.incr("circuit_opened", source=name)
+    return items, status
+
+
+def _start_daemon_workers(tasks, workers):
+    """
+    tasks: [(Future، الدالة، المعاملات)]. العمال daemon: جلب تأخر عن المهلة
+    ما يأخر خروج العملية (مع إعادة المحاولات ممكن يوصل دقائق)، ونتيجته
+    ما تُستخدم لأن fetch_all رجع قبلها.
+    """
+    todo = queue.SimpleQueue()
+    for task in tasks:
+        todo.put(task)
+
+    def worker():
+        while True:
+            try:
+                fut, fn, args = todo.get_nowait()
+            except queue.Empty:
+                return
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(fn(*args))
+            except BaseException as e:
+                fut.set_exception(e)
+
+    for _ in range(min(len(tasks), workers)):
+        threading.Thread(target=worker, name="fetch", daemon=True).start()
+
+
+def _timed_fetch(metrics, name, fn, *args, max_age_days, timeout=None):
+    t0 = time.perf_counter()
+    status = "OK"
+    try:
+        return fn(*args, max_age_days=max_age_days, metrics=metrics, timeout=timeout)
+    except Exception as e:
+        status = type(e).__name__
+        raise
+    finally:
+        metrics.add_time("fetch", time.perf_counter() - t0, source=name)
+        metrics.incr("fetch_status", source=name, status=status)
+
+
+def merge_results(results):
+    """
+    (items, status_notes) من نتائج fetch_all. نفس الخبر من شريحتين (نفس
+    الرابط) يطلع مرة وحدة. الحالة لكل مصدر: "Google=OK" إذا كل الشرائح
+    نفس الحالة، وإلا "Google=OK×12،Timeout×2".
+    """
+    items = []
+    links = set()
+    statuses = {}
+    for name, got, status in results:
+        statuses.setdefault(name, Counter())[status] += 1
+        for it in got or []:
+            key = it["link"] or it["title"]
+            if key in links:
+                continue
+            links.add(key)
+            items.append(it)
+
+    status_notes = []
+    for name, counts in statuses.items():
+        if len(counts) == 1:
+            status_notes.append(f"{name}={next(iter(counts))}")
+        else:
+            status_notes.append(f"{name}=" + "،".join(f"{st}×{n}" for st, n in counts.items()))
+    return items, status_notes
+
+
+def sources_ok(results):
+    """{اسم المصدر: True إذا نجحت شريحة وحدة على الأقل}."""
+    ok = {}
+    for name, _, status in results:
+        ok[name] = ok.get(name, False) or fetched_ok(status)
+    return ok
+
+
+def fetched_ok(status):
+    # 304 = لا جديد، مو فشل
+    return status in ("OK", "NotModified")
@@ -0,0 +1,188 @@
+import os
+import re
+import json
+import mmap
+import struct
+import hashlib
+import threading
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+from state_store import atomic_write_bytes
+
+# =========================
+# فهرس الأماكن (gazetteer)
+# =========================
+# الأسماء في ملف بيانات (data/gazetteer.tsv: الدولة، المستوى، الاسم العربي،
+# الأسماء البديلة) بدل قاموس في الكود، وممكن يوصل عشرات الآلاف.
+# الملف يُجمَّع مرة إلى فهرس ثنائي بجانبه (.idx) ويُفتح بعدها بـ mmap:
+# التشغيل ما يعيد البناء، وجداول البحث تُقرأ من الملف مباشرة.
+#
+# الفهرس: جداول بصمات (blake2b 64-bit) مرتبة للعبارات ولأول كلمة فيها.
+# النص يتقسم كلمات، وعند كل كلمة: إذا هي بداية اسم نجرب من أطول
+# عبارة ممكنة للأقصر — فالاسم الأطول يفوز ("north darfur" قبل "darfur")
+# وتكلفة الخبر على قدر عدد كلماته، مو عدد الأسماء.
+
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.tsv")
+
+MAGIC = b"GZX1"
+HEADER = struct.Struct("<4sQQIII")   # magic، حجم المصدر، mtime_ns، عبارات، كلمات أولى، طول البيانات
+
+_TOKEN = re.compile(r"\w+")
+_DIACRITICS = re.compile("[\u064b-\u0652\u0640]")   # تشكيل وتطويل
+_ALEF = str.maketrans("أإآ", "ااا")
+
+
+def normalize(text):
+    return _DIACRITICS.sub("", (text or "").casefold()).translate(_ALEF)
+
+
+def tokens(text):
+    return _TOKEN.findall(normalize(text))
+
+
+@lru_cache(maxsize=65536)
+def _hash(phrase):
+    return int.from_bytes(hashlib.blake2b(phrase.encode(), digest_size=8).digest(), "little")
+
+
+def read_entries(path):
+    """[(الدولة، المستوى، الاسم العربي، [الأسماء])] من ملف البيانات."""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            country, level, name, aliases = line.split("\t")
+            names = [a for a in aliases.split("|") if a.strip()]
+            entries.append((country, int(level), name, [name, *names]))
+    return entries
+
+
+def build_index(entries, source_size=0, source_mtime=0):
+    phrases = {}     # بصمة العبارة → أرقام الأماكن
+    first = {}       # بصمة أول كلمة → أطول عبارة تبدأ بها (بالكلمات)
+    for i, (_, _, _, names) in enumerate(entries):
+        for alias in names:
+            words = tokens(alias)
+            if not words:
+                continue
+            phrases.setdefault(_hash(" ".join(words)), set()).add(i)
+            h = _hash(words[0])
+            first[h] = min(255, max(first.get(h, 0), len(words)))
+
+    pairs = sorted((h, i) for h, ids in phrases.items() for i in ids)
+    firsts = sorted(first.items())
+    meta = json.dumps([e[:3] for e in entries], ensure_ascii=False).encode()
+    parts = [
+        HEADER.pack(MAGIC, source_size, source_mtime, len(pairs), len(firsts), len(meta)),
+        struct.pack(f"<{len(pairs)}Q", *(h for h, _ in pairs)),
+        struct.pack(f"<{len(pairs)}I", *(i for _, i in pairs)),
+        struct.pack(f"<{len(firsts)}Q", *(h for h, _ in firsts)),
+        bytes(n for _, n in firsts),
+        meta,
+    ]
+    return b"".join(parts)
+
+
+class Gazetteer:
+    """
+    find(text) → [(الدولة، المستوى، الاسم العربي)] للأسماء الموجودة، الأطول أولاً.
+    region(text, country) → أطول اسم في هذي الدولة، أو None.
+    """
+
+    def __init__(self, path=GAZETTEER_FILE, index_path=None):
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        self._buf = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # الفهرس يُفتح عند أول استخدام (الاستيراد ما يلمس القرص)
+        with self._lock:
+            if self._buf is not None:
+                return
+            st = os.stat(self.path)
+            buf = self._map(st)
+            if buf is None:
+                data = build_index(read_entries(self.path), st.st_size, st.st_mtime_ns)
+                try:
+                    atomic_write_bytes(self.index_path, data)
+                    buf = self._map(st)
+                except OSError:
+                    buf = None
+                if buf is None:   # مجلد للقراءة فقط: الفهرس في الذاكرة
+                    buf = memoryview(data)
+            self._attach(buf)
+
+    def _map(self, st):
+        """mmap للفهرس إذا موجود ومبني من نفس نسخة ملف البيانات."""
+        try:
+            with open(self.index_path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(buf) < HEADER.size:
+            return None
+        magic, size, mtime, *_ = HEADER.unpack_from(buf)
+        if magic != MAGIC or size != st.st_size or mtime != st.st_mtime_ns:
+            buf.close()
+            return None
+        return buf
+
+    def _attach(self, buf):
+        _, _, _, n_pairs, n_first, n_meta = HEADER.unpack_from(buf)
+        view = memoryview(buf)
+        pos = HEADER.size
+        self._hashes = view[pos:pos + 8 * n_pairs].cast("Q")
+        pos += 8 * n_pairs
+        self._ids = view[pos:pos + 4 * n_pairs].cast("I")
+        pos += 4 * n_pairs
+        self._first = view[pos:pos + 8 * n_first].cast("Q")
+        pos += 8 * n_first
+        self._first_len = view[pos:pos + n_first]
+        pos += n_first
+        self._entries = [tuple(e) for e in json.loads(bytes(view[pos:pos + n_meta]))]
+        self._buf = buf
+
+    def __len__(self):
+        self._load()
+        return len(self._entries)
+
+    def _max_len(self, word):
+        h = _hash(word)
+        i = bisect_left(self._first, h)
+        return self._first_len[i] if i < len(self._first) and self._first[i] == h else 0
+
+    def _lookup(self, phrase):
+        h = _hash(phrase)
+        lo = bisect_left(self._hashes, h)
+        hi = bisect_right(self._hashes, h, lo)
+        return [self._entries[self._ids[i]] for i in range(lo, hi)]
+
+    def find(self, text):
+        self._load()
+        words = tokens(text)
+        found = []   # (عدد الكلمات، الموضع، المكان)
+        i = 0
+        while i < len(words):
+            n = min(self._max_len(words[i]), len(words) - i)
+            while n:
+                places = self._lookup(" ".join(words[i:i + n]))
+                if places:
+                    found.extend((n, i, p) for p in places)
+                    break
+                n -= 1
+            i += n or 1
+        found.sort(key=lambda f: (-f[0], -f[2][1], f[1]))
+        return [p for _, _, p in found]
+
+    def region(self, text, country):
+        for place_country, _, name in self.find(text):
+            if place_country == country:
+                return name
+        return None
+
+
+GAZETTEER = Gazetteer()
@@ -0,0 +1,109 @@
+import json
+import zipfile
+import itertools
+import threading
+from collections import deque
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# =========================
+# تسجيل وإعادة تشغيل ردود HTTP
+# =========================
+# Recorder: كل رد GET ينحفظ كما وصل (الحالة، رؤوس مختارة، الجسم) في أرشيف zip مضغوط.
+# Replayer: نفس الطلبات ترجع من الأرشيف بدون شبكة، ورسائل Telegram تنحفظ
+# في قائمة بدل الإرسال — فالتحليل والكشف يشتغلون على بيانات حقيقية ملتقطة
+# بدون اتصال وبدون مفتاح بوت (للقياس واختبارات الانحدار).
+# التركيب عبر http_client.ARCHIVE.
+
+TELEGRAM_HOST = "api.telegram.org"
+KEEP_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+def request_key(method, url, params=None):
+    return f"{method.upper()} {requests.Request(method, url, params=params).prepare().url}"
+
+
+class Recorder:
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=9)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def handle(self, method, url, headers=None, **kwargs):
+        # الأرشيف لازم فيه الرد كامل: 304 ما يفيد إعادة التشغيل في مجلد فاضي
+        for h in CONDITIONAL_HEADERS:
+            (headers or {}).pop(h, None)
+        return None  # الطلب يروح للشبكة، والرد يوصل record
+
+    def record(self, method, url, r, params=None, **kwargs):
+        if method.upper() != "GET":
+            return
+        # نقرأ الجسم كامل حتى ينحفظ؛ iter_content بعدها يقرأ من الذاكرة
+        # (فالإيقاف المبكر لتيار RSS ما يوفر تحميل في وضع التسجيل)
+        body = r.content
+        meta = {
+            "key": request_key(method, url, params),
+            "status": r.status_code,
+            "headers": {h: r.headers[h] for h in KEEP_HEADERS if h in r.headers},
+        }
+        with self._lock:
+            n = next(self._seq)
+            self._zip.writestr(f"{n:06d}.json", json.dumps(meta, ensure_ascii=False))
+            self._zip.writestr(f"{n:06d}.body", body)
+
+    def close(self):
+        with self._lock:
+            self._zip.close()
+
+
+class Replayer:
+    """
+    الطلب المتكرر (daemon، عدة دورات) ياخذ الردود بترتيب تسجيلها،
+    وآخر رد يتكرر. طلب غير موجود في الأرشيف = ConnectionError.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._lock = threading.Lock()
+        self._index = {}
+        for name in sorted(self._zip.namelist()):
+            if name.endswith(".json"):
+                meta = json.loads(self._zip.read(name))
+                self._index.setdefault(meta["key"], deque()).append((name[:-5], meta))
+        self.telegram = []
+
+    def handle(self, method, url, params=None, json=None, **kwargs):
+        if TELEGRAM_HOST in url:
+            with self._lock:
+                self.telegram.append(json)
+            return _response(200, {"Content-Type": "application/json"}, b'{"ok":true}', url)
+
+        key = request_key(method, url, params)
+        with self._lock:
+            entries = self._index.get(key)
+            if not entries:
+                raise requests.ConnectionError(f"not in archive: {key}")
+            name, meta = entries[0] if len(entries) == 1 else entries.popleft()
+            body = self._zip.read(f"{name}.body")
+        return _response(meta["status"], meta["headers"], body, key.partition(" ")[2])
+
+    def record(self, method, url, r, **kwargs):
+        pass
+
+    def close(self):
+        self._zip.close()
+
+
+def _response(status, headers, body, url):
+    r = requests.Response()
+    r.status_code = status
+    r.headers = CaseInsensitiveDict(headers)
+    r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+    r.url = url
+    r._content = body
+    r._content_consumed = True
+    return r
@@ -0,0 +1,81 @@
+import threading
+import requests
+
+import http_client
+from state_store import atomic_write_json, read_json
+
+# =========================
+# طلبات شرطية (ETag / Last-Modified)
+# =========================
+# نحفظ ETag و Last-Modified لكل رابط، ونرسلها في الطلب التالي.
+# إذا رد السيرفر 304 نرفع NotModified ونتخطى التحليل بالكامل.
+# الجلب يرجع القيم مع الأخبار (validators) بدون ما يحفظها؛ المستدعي
+# يحفظها (remember) بس إذا استخدم الأخبار فعلاً — جلب تأخر عن المهلة
+# وانرمت أخباره ما يسجل ETag، وإلا الطلب الجاي ياخذ 304 وتضيع.
+# والمشغل يرجع عن قيم الدورة (rollback) إذا فشل أي تقرير فيها: الحالة
+# تنحفظ رغم الفشل، ولو انحفظ ETag لخبر ما انعالج ياخذ الطلب الجاي 304 ويضيع.
+
+
+class NotModified(Exception):
+    """السيرفر رد 304 — ما فيه جديد منذ آخر جلب."""
+
+
+def cache_key(url, params=None):
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+class HttpCache:
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        self._entries = read_json(self.path, {})
+        return self
+
+    def save(self):
+        with self._lock:
+            atomic_write_json(self.path, self._entries)
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        key = cache_key(url, params)
+        headers = dict(headers or {})
+        with self._lock:
+            entry = self._entries.get(key) or {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        r = http_client.get(url, params=params, headers=headers, **kwargs)
+        if r.status_code == 304:
+            r.close()
+            raise NotModified(key)
+        r.cache_key = key
+        return r
+
+    def validators(self, r):
+        """(المفتاح، القيم) من رد انحلل بنجاح — تنحفظ لاحقاً بـ remember."""
+        return r.cache_key, {
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+        }
+
+    def checkpoint(self):
+        """نسخة من القيم الحالية — ترجع لها rollback إذا فشلت الدورة."""
+        with self._lock:
+            return dict(self._entries)
+
+    def rollback(self, snapshot):
+        with self._lock:
+            self._entries = dict(snapshot)
+
+    def remember(self, validators):
+        """تُستدعى بعد ما تُقبل أخبار الرد."""
+        key, entry = validators
+        with self._lock:
+            if entry["etag"] or entry["last_modified"]:
+                self._entries[key] = entry
+            else:
+                self._entries.pop(key, None)
@@ -0,0 +1,115 @@
+import time
+import random
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# =========================
+# طبقة HTTP مشتركة
+# =========================
+# - Session واحدة: اتصالات TCP/TLS تنعاد استخدامها لكل مضيف
+#   (كل أجزاء رسالة Telegram تمشي على نفس الاتصال).
+# - إعادة محاولة بتأخير أُسّي + jitter للأخطاء العابرة.
+# - مهلة اتصال منفصلة عن مهلة القراءة.
+# - توقيت لكل مضيف (host_stats) للمتابعة.
+# - ARCHIVE: تسجيل الردود أو إعادة تشغيلها بدون شبكة (http_archive.py).
+
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 45
+RETRIES = 2
+BACKOFF_BASE = 1.0     # ثواني
+BACKOFF_MAX = 15.0
+RETRY_STATUS = {500, 502, 503, 504}   # 429 ما نعيدها هنا — كل مصدر له تعامله
+
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+ARCHIVE = None   # Recorder / Replayer، أو None = الشبكة مباشرة
+
+
+def _record(host, seconds, ok):
+    with _stats_lock:
+        st = _stats.setdefault(host, {"requests": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0})
+        st["requests"] += 1
+        st["errors"] += 0 if ok else 1
+        st["total_s"] += seconds
+        st["max_s"] = max(st["max_s"], seconds)
+
+
+def host_stats():
+    """نسخة من التوقيت لكل مضيف (الزمن حتى وصول الرد/الرؤوس)."""
+    with _stats_lock:
+        return {h: dict(st) for h, st in _stats.items()}
+
+
+def _backoff(attempt, retry_after=None):
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(BACKOFF_MAX, retry_after))
+    time.sleep(delay)
+
+
+def _retry_after(r):
+    try:
+        return float(r.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+def request(method, url, timeout=None, retries=RETRIES, **kwargs):
+    """
+    مثل requests.request لكن عبر SESSION مع إعادة المحاولة.
+    timeout: رقم (مهلة القراءة) أو (اتصال، قراءة).
+    الطلبات غير الآمنة للتكرار (POST) تنعاد فقط إذا فشل الاتصال نفسه،
+    حتى ما تنرسل رسالة Telegram مرتين.
+    """
+    if ARCHIVE is not None:
+        r = ARCHIVE.handle(method, url, **kwargs)
+        if r is not None:
+            return r
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    elif not isinstance(timeout, tuple):
+        timeout = (min(CONNECT_TIMEOUT, timeout), timeout)
+    idempotent = method.upper() in ("GET", "HEAD")
+    host = urlsplit(url).hostname or ""
+
+    for attempt in range(retries + 1):
+        last = attempt == retries
+        t0 = time.monotonic()
+        try:
+            r = SESSION.request(method, url, timeout=timeout, **kwargs)
+        except requests.ConnectTimeout:
+            _record(host, time.monotonic() - t0, ok=False)
+            if last:
+                raise
+        except (requests.ConnectionError, requests.Timeout):
+            _record(host, time.monotonic() - t0, ok=False)
+            if last or not idempotent:
+                raise
+        else:
+            ok = r.status_code not in RETRY_STATUS
+            _record(host, time.monotonic() - t0, ok=ok)
+            if ok or last or not idempotent:
+                if ARCHIVE is not None:
+                    ARCHIVE.record(method, url, r, **kwargs)
+                return r
+            r.close()
+            _backoff(attempt, _retry_after(r))
+            continue
+        _backoff(attempt)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -0,0 +1,57 @@
+import re
+
+# =========================
+# مطابق كلمات مُجمَّع (تمريرة واحدة على النص)
+# =========================
+# بدل ما نعمل lower() ونمسح النص مرة لكل مفتاح في كل قاموس،
+# نبني regex واحد من كل المفاتيح ونمر على النص مرة واحدة.
+# النمط (?=(...)) يطابق عند كل موضع بدون استهلاك، فالمفاتيح
+# المتداخلة (مثل "darfur" داخل "north darfur") كلها تنكشف.
+
+
+def _bounded(low, start, end):
+    """حدود كلمة مثل \\b في re: لا حرف كلمة قبل البداية ولا بعد النهاية."""
+    if start > 0 and (low[start - 1].isalnum() or low[start - 1] == "_"):
+        return False
+    if end < len(low) and (low[end].isalnum() or low[end] == "_"):
+        return False
+    return True
+
+
+class KeywordMatcher:
+    """
+    groups: {اسم_المجموعة: مفاتيح مرتبة حسب الأولوية}
+    bounded: مجموعات لازم تنطبق ككلمة كاملة (الاختصارات مثل rvf).
+
+    scan(text) ترجع {اسم_المجموعة: أعلى مفتاح أولوية ظهر في النص}
+    — نفس نتيجة المرور على القاموس بالترتيب وأخذ أول مفتاح موجود.
+    """
+
+    def __init__(self, groups, bounded=()):
+        self._tags = {}
+        for group, keys in groups.items():
+            for rank, key in enumerate(keys):
+                self._tags.setdefault(key.lower(), []).append((group, rank))
+        self._bounded = frozenset(bounded)
+
+        # الأطول أولاً: عند نفس الموضع يفوز المفتاح الأطول،
+        # والمفاتيح الأقصر اللي هي بادئة له نضيفها من _prefixes
+        keys = sorted(self._tags, key=len, reverse=True)
+        self._prefixes = {
+            k: [p for p in keys if p != k and k.startswith(p)] for k in keys
+        }
+        self._rx = re.compile("(?=(" + "|".join(map(re.escape, keys)) + "))")
+
+    def scan(self, text):
+        low = (text or "").lower()
+        best = {}
+        for m in self._rx.finditer(low):
+            start = m.start()
+            key = m.group(1)
+            for k in (key, *self._prefixes[key]):
+                for group, rank in self._tags[k]:
+                    if group in self._bounded and not _bounded(low, start, start + len(k)):
+                        continue
+                    if group not in best or rank < best[group][0]:
+                        best[group] = (rank, k)
+        return {group: k for group, (_, k) in best.items()}
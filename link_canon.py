@@ -0,0 +1,195 @@
+import re
+import time
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+
+import http_client
+from state_store import atomic_write_json, read_json
+
+# =========================
+# توحيد الروابط (canonical URL)
+# =========================
+# نفس المقال يوصل بروابط مختلفة: تحويلات Google News تتغير مع الوقت،
+# و GDELT يعطي الرابط الأصلي، ومعاملات التتبع (utm_...) تختلف.
+# - clean_link: الرابط كما هو بدون معاملات التتبع فقط — هذا اللي ينعرض
+#   في التقرير وينحفظ في events.db وينجلب للإثراء.
+# - strip_tracking: الشكل الموحد للمقارنة فقط (https، المضيف بدون www،
+#   بدون fragment و / الأخيرة، والمعاملات مرتبة) — ما ينعرض لأنه ممكن
+#   يكسر الرابط (موقع بدون https، أو مسار يفرق بالـ /).
+# - روابط مضيفات التحويل (REDIRECT_HOSTS) تنفك بطلب واحد بالتوازي
+#   (عمال ووقت إجمالي محدود)، والنتيجة تنحفظ في link_cache.json:
+#   الرابط المعروف ما ينطلب مرة ثانية.
+# sid يُحسب من الشكل الموحد، فنفس المقال من مصدرين = نفس sid.
+
+LINK_CACHE_FILE = "link_cache.json"
+CACHE_MAX_AGE_DAYS = 200      # أكبر من MAX_AGE_DAYS للتقارير
+RESOLVE_WORKERS = 8
+RESOLVE_BUDGET_S = 20
+RESOLVE_TIMEOUT = (5, 10)
+MAX_HTML_BYTES = 256 * 1024
+
+REDIRECT_HOSTS = {
+    "news.google.com", "feedproxy.google.com", "t.co", "bit.ly", "ow.ly",
+    "dlvr.it", "trib.al", "buff.ly", "lnkd.in",
+}
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "ocid",
+    "cmpid", "ref", "ref_src", "smid", "spm", "oc", "_ga", "guccounter",
+}
+TRACKING_PREFIXES = ("utm_", "at_", "pk_", "hsa_")
+
+# صفحة التحويل أحياناً 200 مع الرابط داخل HTML بدل Location
+_HTML_TARGET = re.compile(
+    rb'data-n-au="([^"]+)"'
+    rb'|<link[^>]+rel="canonical"[^>]+href="([^"]+)"'
+    rb'|<meta[^>]+property="og:url"[^>]+content="([^"]+)"',
+    re.I,
+)
+
+
+def _host(url):
+    return (urlsplit(url).hostname or "").lower()
+
+
+def _tracking(key):
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+def clean_link(url):
+    """الرابط بدون معاملات التتبع؛ الباقي (المخطط، المضيف، المسار، الترميز) كما وصل."""
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.query:
+        return url
+    kept = [p for p in parts.query.split("&") if p and not _tracking(p.split("=", 1)[0])]
+    return urlunsplit(parts._replace(query="&".join(kept)))
+
+
+def strip_tracking(url):
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return url
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _tracking(k)
+    )
+    return urlunsplit(("https", host, parts.path.rstrip("/") or "/", urlencode(query), ""))
+
+
+def needs_resolve(url):
+    return _host(url).removeprefix("www.") in REDIRECT_HOSTS
+
+
+def resolve(url):
+    """الرابط النهائي بعد التحويلات. خطأ الشبكة يرتفع (ما ينحفظ)."""
+    r = http_client.get(
+        url, timeout=RESOLVE_TIMEOUT, retries=0, stream=True,
+        headers={"User-Agent": "Mozilla/5.0"},
+    )
+    with r:
+        final = r.url or url
+        if r.ok and needs_resolve(final) and "html" in r.headers.get("Content-Type", ""):
+            head = bytearray()
+            for chunk in r.iter_content(64 * 1024):
+                head += chunk
+                if len(head) >= MAX_HTML_BYTES:
+                    break
+            for m in _HTML_TARGET.finditer(head):
+                target = next(g for g in m.groups() if g).decode("utf-8", "replace")
+                if target.startswith("http") and not needs_resolve(target):
+                    return target
+        return final
+
+
+class LinkCache:
+    """{رابط موحد: [الرابط النهائي بعد التحويل، وقت آخر استخدام]} في ملف JSON مع الحالة."""
+
+    def __init__(self, path=LINK_CACHE_FILE):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        self._entries = read_json(self.path, {})
+        return self
+
+    def save(self, now=None):
+        cutoff = (now if now is not None else time.time()) - CACHE_MAX_AGE_DAYS * 86400
+        with self._lock:
+            self._entries = {k: v for k, v in self._entries.items() if v[1] >= cutoff}
+            atomic_write_json(self.path, self._entries)
+
+    def get(self, url, now=None):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            entry[1] = int(now if now is not None else time.time())
+            return entry[0]
+
+    def put(self, url, target, now=None):
+        with self._lock:
+            self._entries[url] = [target, int(now if now is not None else time.time())]
+
+
+LINKS = LinkCache()
+
+
+def resolve_links(urls, metrics=None, cache=LINKS, budget_s=RESOLVE_BUDGET_S):
+    """
+    {الرابط كما وصل: (رابط العرض، الرابط الموحد)}. رابط العرض = الرابط النهائي
+    بعد التحويل بدون معاملات التتبع، والموحد للـ sid فقط. التحويلات غير المعروفة
+    تنفك بالتوازي حتى budget_s؛ اللي ما خلص أو فشل بالشبكة ياخذ الرابط كما وصل
+    (بدون حفظ، ينجرب الدورة الجاية — وتجميع القصص يمسك التكرار بالعنوان).
+    """
+    out = {}
+    todo = {}
+    for url in dict.fromkeys(u for u in urls if u):
+        link = clean_link(url)
+        key = strip_tracking(url)
+        out[url] = (link, key)
+        if not needs_resolve(key):
+            continue
+        hit = cache.get(key)
+        if hit is not None:
+            # الذاكرة القديمة فيها الشكل الموحد؛ strip_tracking عليه ما يغيره
+            out[url] = (clean_link(hit), strip_tracking(hit))
+            if metrics is not None:
+                metrics.incr("links", status="cached")
+        else:
+            todo.setdefault(key, []).append(url)
+    if not todo:
+        return out
+
+    pool = ThreadPoolExecutor(max_workers=min(len(todo), RESOLVE_WORKERS))
+    # الطلب بالرابط كما وصل (المخطط الأصلي)، والحفظ بالموحد
+    futures = {pool.submit(resolve, urls[0]): key for key, urls in todo.items()}
+    done, pending = wait(futures, timeout=budget_s)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    for fut in done:
+        key = futures[fut]
+        try:
+            target = clean_link(fut.result())
+        except requests.RequestException as e:
+            if metrics is not None:
+                metrics.incr("links", status=type(e).__name__)
+            continue
+        cache.put(key, target)
+        for url in todo[key]:
+            out[url] = (target, strip_tracking(target))
+        if metrics is not None:
+            metrics.incr("links", status="resolved")
+    if metrics is not None and pending:
+        metrics.incr("links", len(pending), status="timeout")
+    return out
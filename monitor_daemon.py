@@ -0,0 +1,72 @@
+import time
+import signal
+import threading
+import traceback
+
+# =========================
+# وضع التشغيل المستمر (daemon)
+# =========================
+# بدل تشغيل بارد كل 12 ساعة: عملية واحدة تبقى شغالة وتحتفظ في الذاكرة
+# بالاتصالات والمطابق المُجمَّع وسجل المرسل، وكل مصدر له فترة استطلاع
+# خاصة تتكيف مع نتائجه، والحالة تنحفظ على القرص كل فترة.
+
+
+class SourceSchedule:
+    """
+    فترة استطلاع متكيفة لمصدر واحد (بالثواني):
+    - فيه جديد → نقرّب الاستطلاع (÷2)
+    - لا جديد → نبعّد تدريجياً (×1.25)
+    - فشل → نبعّد بقوة (×2) حتى ما نضغط على مصدر حاجبنا
+    """
+
+    def __init__(self, name, interval, min_interval, max_interval):
+        self.name = name
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.next_at = 0.0
+
+    def update(self, now, new_count):
+        if new_count is None:
+            factor = 2.0
+        elif new_count > 0:
+            factor = 0.5
+        else:
+            factor = 1.25
+        self.interval = min(self.max_interval, max(self.min_interval, self.interval * factor))
+        self.next_at = now + self.interval
+
+
+def run_daemon(schedules, run_cycle, flush, flush_every=600, clock=time.monotonic):
+    """
+    run_cycle(names) -> {name: عدد الأحداث الجديدة، أو None عند الفشل}
+    flush() يحفظ الحالة. SIGTERM/SIGINT يوقف الحلقة بعد حفظ أخير.
+    """
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+
+    last_flush = clock()
+    try:
+        while not stop.is_set():
+            now = clock()
+            due = [s for s in schedules if s.next_at <= now]
+            if due:
+                try:
+                    results = run_cycle([s.name for s in due])
+                except Exception:
+                    # دورة فاشلة ما توقف العملية؛ نعاملها كفشل لكل المصادر المستحقة
+                    traceback.print_exc()
+                    results = {}
+                now = clock()
+                for s in due:
+                    s.update(now, results.get(s.name))
+
+            if now - last_flush >= flush_every:
+                flush()
+                last_flush = now
+
+            wake = min(s.next_at for s in schedules)
+            stop.wait(max(1.0, min(wake, last_flush + flush_every) - clock()))
+    finally:
+        flush()
@@ -0,0 +1,103 @@
+import re
+import datetime
+
+# =========================
+# تاريخ النشر (pubDate / seendate)
+# =========================
+# الصيغ اللي توصل من المصادر:
+# - RFC 822 (Google/ProMED): Sat, 28 Feb 2026 00:00:00 GMT  (أو +0300)
+# - ISO 8601: 2026-02-28T00:00:00Z  (أو +03:00، أو بدون وقت)
+# - GDELT seendate: 20260228T000000Z
+# كل صيغة لها تعبير منتظم واحد يتعرف عليها بأول حرف، بدل تجربة strptime
+# بكل الصيغ داخل try — فالتاريخ يتحلل بمطابقة وحدة بدون استثناءات.
+#
+# التاريخ يتحلل مرة عند الجلب ويُحفظ في العنصر (pub_dt)، والحد الزمني
+# يُحسب مرة لكل دورة (cutoff)، فالفلترة مقارنة وحدة لكل عنصر.
+# التاريخ غير المفهوم = None، والعنصر ينحذف (ما نعرف عمره).
+
+UTC = datetime.timezone.utc
+
+MONTHS = {
+    m: i for i, m in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1
+    )
+}
+# اختصارات المناطق الزمنية في RFC 822 (بالساعات)؛ غير المعروف = UTC
+ZONES = {
+    "gmt": 0, "ut": 0, "utc": 0, "z": 0,
+    "est": -5, "edt": -4, "cst": -6, "cdt": -5, "mst": -7, "mdt": -6, "pst": -8, "pdt": -7,
+}
+
+_GDELT = re.compile(r"(\d{4})(\d\d)(\d\d)T(\d\d)(\d\d)(\d\d)Z")
+_ISO = re.compile(
+    r"(\d{4})-(\d\d)-(\d\d)(?:[T ](\d\d):(\d\d)(?::(\d\d)(?:\.\d+)?)?)?\s*(Z|[+-]\d\d:?\d\d)?",
+    re.I,
+)
+_RFC822 = re.compile(
+    r"(?:[A-Za-z]{3,9},?\s+)?(\d{1,2})\s+([A-Za-z]{3})[a-z]*\s+(\d{4})"
+    r"\s+(\d{1,2}):(\d\d)(?::(\d\d))?\s*([A-Za-z]{1,5}|[+-]\d{4})?",
+)
+
+
+def _offset(zone):
+    """الفرق عن UTC بالدقائق من "+0300" أو "+03:00" أو "GMT"."""
+    if not zone:
+        return 0
+    if zone[0] in "+-":
+        digits = zone[1:].replace(":", "")
+        minutes = int(digits[:2]) * 60 + int(digits[2:])
+        return -minutes if zone[0] == "-" else minutes
+    return ZONES.get(zone.lower(), 0) * 60
+
+
+def _build(year, month, day, hour, minute, second, offset):
+    if not (1 <= month <= 12 and 1 <= day <= 31 and hour <= 23 and minute <= 59 and second <= 60):
+        return None
+    try:
+        dt = datetime.datetime(year, month, day, hour, minute, min(second, 59), tzinfo=UTC)
+    except ValueError:      # يوم خارج الشهر (30 فبراير)
+        return None
+    return dt - datetime.timedelta(minutes=offset) if offset else dt
+
+
+def parse_pub(pub):
+    """datetime بتوقيت UTC، أو None إذا التاريخ فاضي أو بصيغة غير معروفة."""
+    pub = (pub or "").strip()
+    if not pub:
+        return None
+    if pub[0].isdigit():
+        m = _GDELT.fullmatch(pub)
+        if m:
+            return _build(*map(int, m.groups()), 0)
+        m = _ISO.fullmatch(pub)
+        if m:
+            y, mo, d, h, mi, s, zone = m.groups()
+            return _build(int(y), int(mo), int(d), int(h or 0), int(mi or 0), int(s or 0), _offset(zone))
+    m = _RFC822.fullmatch(pub)
+    if m:
+        d, mon, y, h, mi, s, zone = m.groups()
+        month = MONTHS.get(mon.lower())
+        if month is None:
+            return None
+        return _build(int(y), month, int(d), int(h), int(mi), int(s or 0), _offset(zone))
+    return None
+
+
+def stamp(item):
+    """pub_dt للعنصر: يتحلل مرة ويُحفظ فيه (العنصر مشترك بين التقارير)."""
+    if "pub_dt" not in item:
+        item["pub_dt"] = parse_pub(item.get("pub"))
+    return item["pub_dt"]
+
+
+def cutoff(days, now=None):
+    """
+    أقدم تاريخ مقبول لعمر days يوم: العنصر حديث إذا pub_dt > cutoff.
+    (يوم كامل إضافي: العمر بالأيام الكاملة <= days، مثل الفلتر السابق)
+    """
+    now = now if now is not None else datetime.datetime.now(tz=UTC)
+    return now - datetime.timedelta(days=days + 1)
+
+
+def timestamp(pub_dt):
+    return int(pub_dt.timestamp()) if pub_dt is not None else None
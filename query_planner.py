@@ -0,0 +1,36 @@
+# =========================
+# تقسيم الاستعلامات (shards)
+# =========================
+# استعلام واحد فيه كل الدول وكل الأمراض يصطدم بحد النتائج
+# (GDELT maxrecords، Google RSS ~100 خبر): الدول المزدحمة (الهند) تغطي
+# على الهادئة (جيبوتي). نقسمه إلى شرائح (مجموعة أمراض × مجموعة دول)،
+# كل شريحة job مستقلة تُجلب بالتوازي تحت محدد معدل مشترك لكل مضيف،
+# والنتائج تندمج وتنحذف المكررات (feeds.merge_results).
+#
+# نفس المجموعات بنفس الترتيب = نفس نص الاستعلام، فالتقارير اللي تشارك
+# مجموعات تشارك الجلب (runner يوحد jobs بنفس المعاملات).
+
+
+def quote(term):
+    return f'"{term}"' if " " in term and not term.startswith('"') else term
+
+
+def or_group(terms):
+    terms = [quote(t) for t in terms]
+    return terms[0] if len(terms) == 1 else f"({' OR '.join(terms)})"
+
+
+def chunks(seq, size):
+    return [seq[i:i + size] for i in range(0, len(seq), size)]
+
+
+def shard_queries(disease_groups, countries, countries_per_shard=1):
+    """
+    disease_groups: [[مصطلحات]]، countries: [أسماء الدول كما تُكتب في البحث].
+    ترجع نصوص الاستعلامات: كل مجموعة أمراض × كل دفعة دول.
+    """
+    return [
+        f"{or_group(diseases)} {or_group(batch)}"
+        for diseases in disease_groups
+        for batch in chunks(list(countries), countries_per_shard)
+    ]
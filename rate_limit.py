@@ -0,0 +1,36 @@
+import time
+import threading
+
+# =========================
+# محدد معدل الطلبات (token bucket)
+# =========================
+# مشترك بين الخيوط: كل طلب ياخذ رمز، والرموز تتجدد بمعدل rate في الثانية
+# حتى burst. الانتظار خارج القفل، فالخيوط الثانية ما تتعطل على النوم.
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, n=1):
+        """ينتظر حتى يتوفر n رمز ويستهلكها. يرجع زمن الانتظار بالثواني."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(self._clock())
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return waited
+                delay = (n - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
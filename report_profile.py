@@ -0,0 +1,431 @@
+import os
+import time
+import hashlib
+import datetime
+
+import subscriptions
+from article_text import article_texts
+from event_backlog import Backlog
+from event_scoring import EventScorer
+from event_store import EventStore
+from feeds import fetch_gdelt, fetch_google, fetch_promed, fetched_ok, merge_results, sources_ok
+from gazetteer import GAZETTEER
+from keyword_matcher import KeywordMatcher
+from link_canon import resolve_links
+from pubdate import cutoff as pub_cutoff, stamp, timestamp
+from query_planner import shard_queries
+from run_metrics import RunMetrics
+from spike_detector import SpikeDetector
+from story_clusters import StoryIndex, title_signature
+from tg_delivery import Outbox, pack_blocks
+
+# =========================
+# دورة التقرير (مشتركة بين كل التقارير)
+# =========================
+# ملف التقرير (main.py، animal_monitor_ar.py) إعدادات بس: القواميس
+# والتصنيفات والعناوين والعمر والمصادر. ReportProfile يبني منها المطابق
+# والمرتب ويشغل نفس الدورة لكل التقارير:
+# عمر → كشف → توحيد الروابط → مكرر/نفس القصة → ترتيب → إثراء → حفظ → إرسال.
+#
+# إعدادات اختيارية: GENERIC_SIGNALS + GENERIC_DISEASE (تنبيه بيطري عام
+# بدون مرض محدد)، DISEASE_ABBR_FULL (الأسماء الكاملة لنفس المرض للإثراء)،
+# GDELT_COUNTRIES_PER_SHARD و GDELT_MAXRECORDS (مع GDELT).
+
+KSA_TZ = datetime.timezone(datetime.timedelta(hours=3))
+EVENTS = EventStore()  # events.db مشترك بين التقارير (عمود profile)
+METRICS_DIR = os.environ.get("MONITOR_METRICS_DIR", "metrics")
+# جلب نص المقال الكامل للأحداث المرسلة (article_text.py) لتحديد المنطقة
+ENRICH_ARTICLES = os.environ.get("MONITOR_ENRICH_ARTICLES") == "1"
+
+REGION_DEFAULT = "داخل الدولة"
+REGION_UNKNOWN = "غير محدد"
+HOME_COUNTRY = "saudi arabia"   # مفتاح في COUNTRY_KEYS؛ أحداثها ترتفع بالترتيب
+
+# اسم المصدر في items لكل job
+JOB_SOURCE = {"ProMED": "ProMED", "GDELT": "GDELT", "Google": "Google News"}
+
+
+# ===== وقت =====
+def now_ksa():
+    return datetime.datetime.now(tz=KSA_TZ)
+
+
+def now_ksa_str():
+    return now_ksa().strftime("%Y-%m-%d %H:%M") + " بتوقيت السعودية"
+
+
+# ===== sid =====
+def make_sid(url, title):
+    # url بالشكل الموحد (link_canon.strip_tracking): نفس المقال من مصدرين = نفس sid؛
+    # العنوان لو ما فيه رابط
+    raw = url if url else "|" + (title or "")
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def legacy_sid(url, title):
+    # sid قبل توحيد الروابط (الرابط كما وصل + العنوان)؛ يُفحص حتى تنتهي نافذة MAX_AGE_DAYS
+    raw = (url or "") + "|" + (title or "")
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+# ===== نص التقرير =====
+def _surge_line(surge):
+    disease, country, n, rate, _ = surge
+    return f"🚨 ارتفاع مفاجئ: {disease} في {country} — {n} إشارة اليوم (المعدل {rate:.1f}/يوم)"
+
+
+def _event_block(i, e):
+    return (
+        f"{i}) [{' + '.join(e['sources'])}] {e['label']}  🐾 {e['disease']}\n"
+        f"   🌍 الدولة: {e['country']}\n"
+        f"   📍 المنطقة: {e['region']}\n"
+        f"   📰 العنوان: {e['title']}\n"
+        f"   🔗 الرابط: {e['link']}"
+    )
+
+
+class ReportProfile:
+    """
+    تقرير واحد من ملف إعداداته (config: وحدة أو أي كائن بنفس الأسماء).
+    الحالة في الذاكرة (OUTBOX، المقاييس) لكل تقرير، و events.db مشترك.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.name = config.PROFILE   # مساحة هذا التقرير في مخزن الحالة المشترك
+        self.max_age_days = config.MAX_AGE_DAYS
+        self.daemon_intervals = config.DAEMON_INTERVALS
+        self.generic_disease = getattr(config, "GENERIC_DISEASE", None)
+        # اسم الاختصار → [(مفتاح الاسم الكامل، اسمه في التقرير)] لنفس المرض، بالأفضلية
+        self._full_names = {
+            config.DISEASE_ABBR[abbr]: [(key, config.DISEASE_FULL[key]) for key in keys]
+            for abbr, keys in getattr(config, "DISEASE_ABBR_FULL", {}).items()
+        }
+        self.outbox = Outbox()
+        # توقيت المضيفات مشترك بين التقارير؛ يكتبه سجل المشغل
+        self.metrics = RunMetrics(self.name, hosts=False)
+        self.scorer = EventScorer(
+            config.LABEL_SCORE, config.DISEASE_SEVERITY, config.COUNTRY_KEYS[HOME_COUNTRY],
+        )
+        # مطابق واحد مُجمَّع لكل القواميس — يُبنى مرة عند التحميل
+        groups = {
+            "country": config.COUNTRY_KEYS,
+            "disease": config.DISEASE_FULL,
+            "abbr": config.DISEASE_ABBR,
+            "context": config.DISEASE_CONTEXT,
+        }
+        if self.generic_disease:
+            groups["generic"] = config.GENERIC_SIGNALS
+        groups.update((label, keys) for label, keys in config.LABEL_RULES)
+        self.matcher = KeywordMatcher(groups, bounded={"abbr"})
+        # تقرير بمصدر واحد يقول "المصدر" في رسائله
+        many = len(config.SOURCES) > 1
+        self._status_label = "حالة المصادر" if many else "حالة المصدر"
+        self._fetch_failed = "⚠️ تعذر جلب أي مصدر حالياً." if many else "⚠️ تعذر جلب الأخبار حالياً."
+
+    # ===== Telegram =====
+    def tg_send(self, *blocks, per_chat=None):
+        # كل block (خبر كامل) يبقى في رسالة واحدة قدر الإمكان،
+        # واللي ما ينرسل يبقى في outbox ويُحفظ مع الحالة
+        # مفاتيح Telegram تُقرأ عند الإرسال، مو عند الاستيراد
+        # (القياس والـbackfill وإعادة التشغيل ما يحتاجونها)
+        # per_chat: {chat_id: blocks} للمشتركين، تنرسل مع الرئيسية في دفعة وحدة
+        self.outbox.enqueue(os.environ["TELEGRAM_CHAT_ID"], pack_blocks(blocks))
+        for chat_id, chat_blocks in (per_chat or {}).items():
+            self.outbox.enqueue(chat_id, pack_blocks(chat_blocks))
+        with self.metrics.timer("stage", stage="send"):
+            self.metrics.incr("telegram_sent", self.outbox.flush(os.environ["TELEGRAM_BOT_TOKEN"]))
+
+    # ===== State =====
+    # الحالة في StateStore مشترك (state_store.py)؛ هنا بس مساحة هذا التقرير
+    def load_state(self, store):
+        state = store.profile(self.name, self.max_age_days)
+        self.outbox.load(state.pop("outbox", []))
+        return state
+
+    def dump_state(self, state):
+        state["outbox"] = self.outbox.pending
+
+    # ===== كشف =====
+    # كل الدوال تقبل hits جاهزة من matcher.scan حتى يُمسح النص مرة واحدة فقط
+    def detect_country(self, text, hits=None):
+        hits = self.matcher.scan(text) if hits is None else hits
+        key = hits.get("country")
+        return self.config.COUNTRY_KEYS[key] if key else None
+
+    def detect_region(self, text, country_ar):
+        # المناطق من فهرس الأماكن (gazetteer.py): أطول اسم في دولة الخبر
+        region = GAZETTEER.region(text, country_ar) if country_ar else None
+        if region:
+            return region
+        return REGION_DEFAULT if country_ar else REGION_UNKNOWN
+
+    def detect_disease(self, text, hits=None):
+        hits = self.matcher.scan(text) if hits is None else hits
+
+        # أولاً: أسماء كاملة
+        key = hits.get("disease")
+        if key:
+            return self.config.DISEASE_FULL[key]
+
+        # ثانياً: الاختصارات (ككلمة كاملة) فقط بوجود سياق مرضي
+        key = hits.get("abbr")
+        if key and "context" in hits:
+            return self.config.DISEASE_ABBR[key]
+
+        # ثالثاً: تنبيه بيطري عام إذا ظهر سياق مرضي واضح
+        if self.generic_disease and "generic" in hits:
+            return self.generic_disease
+
+        return None
+
+    def enrich_event(self, event, text):
+        """
+        نص المقال الكامل: منطقة بدل REGION_DEFAULT، والاسم الكامل لنفس المرض
+        إذا الحدث من اختصار (H5N1 → HPAI). مرض ثاني مذكور في المقال ما يبدل
+        مرض الحدث — المقال ممكن يذكر أمراض كثيرة على الهامش.
+        """
+        changed = False
+        if event["region"] == REGION_DEFAULT:
+            event["region"] = self.detect_region(text, event["country"])
+            changed = event["region"] != REGION_DEFAULT
+        low = text.lower()
+        for key, name in self._full_names.get(event["disease"], ()):
+            if key in low:
+                event["disease"] = name
+                changed = True
+                break
+        return changed
+
+    def classify_item(self, title: str, desc: str, hits=None) -> str:
+        hits = self.matcher.scan(f"{title} {desc}") if hits is None else hits
+        for label, _ in self.config.LABEL_RULES:
+            if label in hits:
+                return label
+        return self.config.LABEL_DEFAULT
+
+    # ===== الجلب =====
+    def build_jobs(self):
+        # شرائح البحث (query_planner.py): كل مجموعة أمراض × كل دولة في Google،
+        # ودفعات دول في GDELT (حد الطلبات عندهم أضيق)
+        c = self.config
+        jobs = []
+        if "ProMED" in c.SOURCES:
+            jobs.append(("ProMED", fetch_promed))   # لو فشل ما يوقف
+        if "GDELT" in c.SOURCES:
+            gdelt = shard_queries(c.DISEASE_QUERY_GROUPS, c.QUERY_COUNTRIES, c.GDELT_COUNTRIES_PER_SHARD)
+            # لو رجع غير JSON ما ننهار
+            jobs.extend(("GDELT", fetch_gdelt, q, c.GDELT_MAXRECORDS) for q in gdelt)
+        if "Google" in c.SOURCES:
+            google = shard_queries(c.DISEASE_QUERY_GROUPS, c.QUERY_COUNTRIES)
+            jobs.extend(("Google", fetch_google, q) for q in google)
+        return jobs
+
+    # ===== الدورة =====
+    def run_cycle(self, state, results, quiet=False):
+        """
+        دورة واحدة: كشف → إرسال لنتائج جلبها runner (بدون حفظ الحالة).
+        results: [(اسم الـjob، items أو None، الحالة)] لـ jobs هذا التقرير.
+        quiet: لا نرسل رسائل "لا جديد"/"تعذر الجلب" (وضع daemon).
+        ترجع {اسم المصدر: عدد الأحداث الجديدة، أو None إذا فشل}.
+        مقاييس الدورة تنكتب في METRICS_DIR حتى لو فشلت.
+        الذاكرة O(عدد الأخبار المجلوبة): المرشحين (لتوحيد روابطهم دفعة وحدة)
+        والأحداث الجديدة (events.db وتأكيد المصادر) كلها في الذاكرة؛ الكومة
+        بس اللي محدودة بالسعة.
+        """
+        self.metrics.begin()
+        try:
+            return self._run_cycle(state, results, quiet)
+        finally:
+            self.metrics.write(METRICS_DIR)
+
+    def _run_cycle(self, state, results, quiet):
+        c = self.config
+        metrics = self.metrics
+        items, status_notes = merge_results(results)
+
+        # 304 من كل المصادر = لا جديد، مو فشل
+        if not any(fetched_ok(status) for _, _, status in results):
+            if not quiet:
+                self.tg_send(
+                    f"{self._fetch_failed}\n"
+                    f"🕒 {now_ksa_str()}\n"
+                    f"{self._status_label}: {'؛ '.join(status_notes)}"
+                )
+            return self._cycle_result(results, [])
+
+        fresh = []
+        # المؤجل من الدورات السابقة يدخل المنافسة مع الجديد، ويقدر يكسب مصادر جديدة
+        backlog = Backlog(self.max_age_days).load(state.get("backlog"))
+        backlog.rescore(self.scorer)
+        events_by_id = {e["sid"]: e for e in backlog.events()}
+        stories = StoryIndex(c.STORY_WINDOW_DAYS).load(state.get("stories"))
+        spikes = SpikeDetector().load(state.get("spikes"))
+        t_detect = time.perf_counter()
+        candidates = []
+        # الجلب المشترك يفلتر بأكبر عمر بين التقارير؛ هنا نطبق عمر هذا التقرير
+        # قبل أي مطابقة كلمات: حد واحد للدورة ومقارنة بتاريخ محلول مسبقاً
+        oldest = pub_cutoff(self.max_age_days)
+        for it in items:
+            pub_dt = stamp(it)
+            if pub_dt is None:
+                metrics.incr("items_dropped", reason="bad_date", source=it["source"])
+                continue
+            if pub_dt <= oldest:
+                metrics.incr("items_dropped", reason="age", source=it["source"])
+                continue
+
+            blob = f"{it.get('title', '')} {it.get('desc', '')}"
+            hits = self.matcher.scan(blob)
+            disease = self.detect_disease(blob, hits)
+            country = self.detect_country(blob, hits)
+            if not disease or not country:
+                metrics.incr("items_dropped", reason="no_disease" if not disease else "no_country")
+                continue
+            candidates.append((it, blob, hits, disease, country))
+
+        # روابط المرشحين فقط تتوحد (تحويلات Google تنفك بالتوازي مع ذاكرة دائمة)
+        metrics.add_time("stage", time.perf_counter() - t_detect, stage="detect")
+        with metrics.timer("stage", stage="canonicalize"):
+            links = resolve_links([it.get("link", "") for it, *_ in candidates], metrics)
+        t_detect = time.perf_counter()
+
+        for it, blob, hits, disease, country in candidates:
+            region = self.detect_region(blob, country)
+            label = self.classify_item(it.get("title", ""), it.get("desc", ""), hits)
+
+            link, canonical = links.get(it.get("link", ""), ("", ""))
+            sid = make_sid(canonical, it.get("title", ""))
+            if sid in state["seen"] or legacy_sid(it.get("link", ""), it.get("title", "")) in state["seen"]:
+                # نفس الرابط الموحد من مصدر ثاني في نفس الدورة يأكد الحدث
+                ev = events_by_id.get(sid)
+                if ev is not None and it["source"] not in ev["sources"]:
+                    ev["sources"].append(it["source"])
+                metrics.incr("items_dropped", reason="seen")
+                continue
+            state["seen"].add(sid)
+            # كل إشارة جديدة تنعد للزوج، حتى لو كانت نفس قصة من مصدر ثاني
+            spikes.add(disease, country)
+
+            # نفس القصة بعنوان/رابط مختلف: نضيف المصدر للحدث بدل حدث جديد
+            sig = title_signature(it.get("title", ""))
+            group = f"{disease}|{country}"
+            story_id = stories.match(sig, group)
+            if story_id is not None:
+                ev = events_by_id.get(story_id)
+                if ev is not None and it["source"] not in ev["sources"]:
+                    ev["sources"].append(it["source"])
+                metrics.incr("items_dropped", reason="duplicate_story")
+                continue  # أو انرسلت في تشغيل سابق
+            stories.add(sid, sig, group)
+
+            event = {
+                "source": it["source"],
+                "sources": [it["source"]],
+                "label": label,
+                "disease": disease,
+                "country": country,
+                "region": region,
+                "title": it.get("title", ""),
+                "link": link,
+                "pub_ts": timestamp(it["pub_dt"]),
+                "sid": sid,
+            }
+            events_by_id[sid] = event
+            fresh.append(event)
+
+            # كل المرشحين يتنافسون بالدرجة في كومة محدودة (مرور واحد):
+            # أعلى MAX_ITEMS تنرسل والباقي يتأجل للدورة الجاية بدل إعادة جلبه
+            if backlog.push(event, self.scorer(event)) is not None:
+                metrics.incr("items_dropped", reason="backlog_full")
+
+        # المصادر المؤكدة اللي انضافت بعد الإدخال ترفع الدرجة
+        backlog.rescore(self.scorer)
+        new_events = backlog.pop(c.MAX_ITEMS)
+        state["backlog"] = backlog.dump()
+        metrics.add_time("stage", time.perf_counter() - t_detect, stage="detect")
+
+        # الإثراء للمختار للإرسال فقط، قبل الحفظ في events.db. الجلب برابط
+        # العرض، والذاكرة بالشكل الموحد (نفس مفتاح sid)
+        if ENRICH_ARTICLES and new_events:
+            with metrics.timer("stage", stage="enrich"):
+                texts = article_texts([e["link"] for e in new_events], metrics)
+            for e in new_events:
+                if texts.get(e["link"]) and self.enrich_event(e, texts[e["link"]]):
+                    metrics.incr("events_enriched")
+
+        metrics.incr("items_fetched", len(items))
+        metrics.incr("events_new", len(fresh))
+        with metrics.timer("stage", stage="store"):
+            metrics.incr("events_stored", EVENTS.add(self.name, fresh))
+        metrics.incr("events_sent", len(new_events))
+        metrics.incr("events_backlog", len(backlog))
+        state["stories"] = stories.dump()
+        surges = spikes.surges()
+        state["spikes"] = spikes.dump()
+        metrics.incr("surges", len(surges))
+        surge_lines = [_surge_line(s) for s in surges]
+        per_chat = self._subscriber_reports(new_events, surges)
+        metrics.incr("subscriber_reports", len(per_chat))
+
+        if not new_events:
+            # التنبيه بالارتفاع ينرسل حتى في وضع daemon
+            if not quiet or surge_lines:
+                self.tg_send(
+                    f"{c.REPORT_TITLE}\n"
+                    f"🕒 {now_ksa_str()}\n"
+                    + "".join(f"{line}\n" for line in surge_lines)
+                    + "════════════════════\n"
+                    "✅ لا توجد إشارات جديدة مطابقة حالياً.\n"
+                    f"ℹ️ {self._status_label}: {'؛ '.join(status_notes)}",
+                    per_chat=per_chat,
+                )
+            return self._cycle_result(results, [])
+
+        lines = [
+            c.REPORT_TITLE,
+            f"🕒 {now_ksa_str()}",
+            *surge_lines,
+            "════════════════════",
+            f"عدد الإشارات الجديدة: {len(new_events)}",
+            *([f"📥 مؤجلة للتقرير القادم: {len(backlog)}"] if len(backlog) else []),
+            f"ℹ️ {self._status_label}: {'؛ '.join(status_notes)}",
+            "════════════════════",
+        ]
+
+        lines.extend(_event_block(i, e) for i, e in enumerate(new_events, 1))
+        self.tg_send(*lines, per_chat=per_chat)
+        return self._cycle_result(results, new_events)
+
+    def _cycle_result(self, results, new_events):
+        result = {}
+        for name, ok in sources_ok(results).items():
+            if not ok:
+                result[name] = None
+                continue
+            src = JOB_SOURCE.get(name, name)
+            result[name] = sum(1 for e in new_events if src in e["sources"])
+        return result
+
+    def _subscriber_reports(self, new_events, surges):
+        """{chat_id: blocks}: كل مشترك ياخذ أحداثه وتنبيهاته فقط (subscriptions.py)."""
+        subs = subscriptions.current()
+        if not len(subs):
+            return {}
+        events = subs.route(new_events, self.name)
+        alerts = subs.route(
+            [{"disease": s[0], "country": s[1], "line": _surge_line(s)} for s in surges], self.name
+        )
+        reports = {}
+        for chat_id in dict.fromkeys([*events, *alerts]):
+            mine = events.get(chat_id, [])
+            reports[chat_id] = [
+                f"{self.config.REPORT_TITLE} — اشتراك",
+                f"🕒 {now_ksa_str()}",
+                *(a["line"] for a in alerts.get(chat_id, [])),
+                "════════════════════",
+                f"عدد الإشارات الجديدة: {len(mine)}",
+                "════════════════════",
+                *(_event_block(i, e) for i, e in enumerate(mine, 1)),
+            ]
+        return reports
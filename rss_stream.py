@@ -0,0 +1,74 @@
+import time
+import xml.etree.ElementTree as ET
+
+from pubdate import parse_pub
+
+# =========================
+# تحليل RSS كتيار
+# =========================
+# بدل r.text + ET.fromstring (الملف كامل في الذاكرة + شجرة كاملة)
+# نغذي XMLPullParser بأجزاء من الرد ونطلع كل <item> أول ما يكتمل،
+# ثم نحذفه من الشجرة. الذاكرة تتبع عدد الأخبار اللي نحتاجها فعلاً.
+# تاريخ النشر يتحلل هنا مرة (pub_dt) ويمشي مع العنصر.
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _item_dict(el, source):
+    pub = (el.findtext("pubDate") or "").strip()
+    return {
+        "source": source,
+        "title": (el.findtext("title") or "").strip(),
+        "link": (el.findtext("link") or "").strip(),
+        "pub": pub,
+        "pub_dt": parse_pub(pub),
+        "desc": (el.findtext("description") or "").strip(),
+    }
+
+
+def iter_rss_items(chunks, source, is_recent=None, sorted_desc=False, stats=None):
+    """
+    chunks: أجزاء bytes (مثل r.iter_content).
+    is_recent(pub_dt) -> bool: فلتر العمر؛ الأخبار القديمة ما تطلع.
+    التاريخ غير المفهوم ما يطلع (ينعد في bad_date) وما يوقف التحليل.
+    sorted_desc: الخلاصة مرتبة من الأحدث — نوقف عند أول خبر قديم
+    بدل ما نكمل تحميل وتحليل الباقي.
+    stats: dict اختياري يتجمع فيه bytes و parse_s و items و old و bad_date.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    parents = []
+    if stats is None:
+        stats = {}
+    for key in ("bytes", "parse_s", "items", "old", "bad_date"):
+        stats.setdefault(key, 0)
+    for chunk in chunks:
+        stats["bytes"] += len(chunk)
+        t0 = time.perf_counter()
+        parser.feed(chunk)
+        for event, el in parser.read_events():
+            if event == "start":
+                parents.append(el)
+                continue
+            parents.pop()
+            if el.tag != "item":
+                continue
+
+            item = _item_dict(el, source)
+            stats["items"] += 1
+            # نحرر العنصر من الشجرة حتى ما تكبر مع الخلاصة
+            el.clear()
+            if parents:
+                parents[-1].remove(el)
+
+            if item["pub_dt"] is None:
+                stats["bad_date"] += 1
+                continue
+            if is_recent is not None and not is_recent(item["pub_dt"]):
+                stats["old"] += 1
+                if sorted_desc:
+                    stats["parse_s"] += time.perf_counter() - t0
+                    return
+                continue
+            yield item
+        stats["parse_s"] += time.perf_counter() - t0
+    parser.close()
@@ -0,0 +1,135 @@
+import os
+import io
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+import http_client
+from state_store import atomic_write_bytes, atomic_write_json
+
+# =========================
+# مقاييس كل تشغيل
+# =========================
+# عدادات وأزمنة لكل مرحلة ومصدر، تنكتب بعد كل تشغيل كـ:
+#   - <dir>/run_<profile>.json  : سجل التشغيل كامل
+#   - <dir>/<profile>.prom      : ملف نصي لـ Prometheus (node_exporter textfile)
+# توقيت المضيفات (http_client.host_stats) عداد واحد للعملية كلها، فيكتبه
+# سجل واحد بس (hosts=True: المشغل أو backfill) بوسم profile، وسجلات
+# التقارير بدونه — وإلا نفس السلسلة تتكرر في كل ملف .prom.
+# MONITOR_PROFILE=cprofile    → <dir>/<profile>.pstats + أعلى الدوال في السجل
+# MONITOR_PROFILE=tracemalloc → أعلى الذاكرة وأكبر مواقع الحجز في السجل
+
+PREFIX = "animal_monitor"
+PROFILE_MODE = os.environ.get("MONITOR_PROFILE", "").lower()
+
+
+def _key(name, labels):
+    if not labels:
+        return name
+    inner = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{inner}}}"
+
+
+def _with_label(key, label):
+    name, brace, rest = key.partition("{")
+    return f"{name}{{{label},{rest}" if brace else f"{name}{{{label}}}"
+
+
+class RunMetrics:
+    def __init__(self, profile, hosts=True):
+        self.profile = profile
+        self.hosts = hosts
+        self._lock = threading.Lock()
+        self.begin()
+
+    def begin(self):
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.counters = {}
+        self.timings = {}
+        self.extra = {}
+
+    def incr(self, name, n=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def add_time(self, name, seconds, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.timings[key] = self.timings.get(key, 0.0) + seconds
+
+    @contextmanager
+    def timer(self, name, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0, **labels)
+
+    @contextmanager
+    def capture(self, out_dir):
+        """تشغيل cProfile أو tracemalloc حول الدورة حسب MONITOR_PROFILE."""
+        if PROFILE_MODE == "cprofile":
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+                os.makedirs(out_dir, exist_ok=True)
+                prof.dump_stats(os.path.join(out_dir, f"{self.profile}.pstats"))
+                buf = io.StringIO()
+                pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(25)
+                self.extra["cprofile_top"] = buf.getvalue().splitlines()
+        elif PROFILE_MODE == "tracemalloc":
+            tracemalloc.start()
+            try:
+                yield
+            finally:
+                snap = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.extra["tracemalloc_peak_bytes"] = peak
+                self.extra["tracemalloc_top"] = [str(s) for s in snap.statistics("lineno")[:20]]
+        else:
+            yield
+
+    def record(self):
+        with self._lock:
+            return {
+                "profile": self.profile,
+                "started": self.started,
+                "duration_s": time.perf_counter() - self._t0,
+                "counters": dict(self.counters),
+                "timings_s": dict(self.timings),
+                **({"hosts": http_client.host_stats()} if self.hosts else {}),
+                **self.extra,
+            }
+
+    def prometheus(self, rec):
+        pl = f'profile="{self.profile}"'
+        lines = [
+            f"{PREFIX}_last_run_timestamp_seconds{{{pl}}} {rec['started']:.0f}",
+            f"{PREFIX}_run_duration_seconds{{{pl}}} {rec['duration_s']:.3f}",
+        ]
+        for key, v in sorted(rec["counters"].items()):
+            lines.append(f"{PREFIX}_{_with_label(key, pl).replace('{', '_total{', 1)} {v}")
+        for key, v in sorted(rec["timings_s"].items()):
+            lines.append(f"{PREFIX}_{_with_label(key, pl).replace('{', '_seconds{', 1)} {v:.6f}")
+        for host, st in sorted(rec.get("hosts", {}).items()):
+            hl = f'host="{host}",{pl}'
+            lines.append(f"{PREFIX}_http_requests_total{{{hl}}} {st['requests']}")
+            lines.append(f"{PREFIX}_http_errors_total{{{hl}}} {st['errors']}")
+            lines.append(f"{PREFIX}_http_seconds_total{{{hl}}} {st['total_s']:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, out_dir):
+        rec = self.record()
+        os.makedirs(out_dir, exist_ok=True)
+        atomic_write_json(os.path.join(out_dir, f"run_{self.profile}.json"), rec)
+        atomic_write_bytes(os.path.join(out_dir, f"{self.profile}.prom"), self.prometheus(rec).encode("utf-8"))
+        return rec
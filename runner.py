@@ -0,0 +1,212 @@
+import os
+import json
+import argparse
+import importlib
+import tempfile
+
+import feeds
+import http_client
+import link_canon
+from http_archive import Recorder, Replayer
+from monitor_daemon import SourceSchedule, run_daemon
+from rate_limit import TokenBucket
+from report_profile import ReportProfile
+from run_metrics import RunMetrics
+from state_store import open_store
+
+# =========================
+# مشغل مشترك لكل التقارير
+# =========================
+# كل تقرير (main.py، animal_monitor_ar.py) ملف إعدادات تشغله نفس الدورة
+# (report_profile.py)، وله jobs خاصة فيه لكن أغلبها نفس الروابط.
+# المشغل يجمع jobs كل التقارير، يجلب كل رابط مرة وحدة في الدورة
+# (بأكبر MAX_AGE_DAYS)، ويوزع النتائج على التقارير. الحالة في مخزن واحد
+# (state.json + seen.bin) ولكل تقرير مساحة أسماء خاصة.
+#
+#     python runner.py            # دورة واحدة لكل التقارير
+#     python runner.py --daemon   # تشغيل مستمر
+#     python runner.py --record feeds.zip   # دورة عادية + حفظ الردود الخام
+#     python runner.py --replay feeds.zip   # نفس الدورة من الأرشيف، بدون شبكة ولا بوت
+
+PROFILES = ["main", "animal_monitor_ar"]
+
+STATE_FILE = "state.json"
+SEEN_FILE = "seen.bin"
+METRICS = RunMetrics("runner")
+METRICS_DIR = os.environ.get("MONITOR_METRICS_DIR", "metrics")
+DAEMON_FLUSH_MINUTES = 10
+
+
+def collect_jobs(profiles, names=None):
+    """jobs كل التقارير بدون تكرار (نفس job_key = نفس الرابط)."""
+    jobs = {}
+    for p in profiles:
+        for job in p.build_jobs():
+            if names is None or job[0] in names:
+                jobs.setdefault(feeds.job_key(job), job)
+    return list(jobs.values())
+
+
+def run_cycle(profiles, states, names=None, quiet=False):
+    """
+    دورة واحدة: جلب مشترك → كشف وإرسال لكل تقرير (بدون حفظ الحالة).
+    إذا فشل أي تقرير ترجع ذاكرة الطلبات لما قبل الدورة.
+    names: أسماء المصادر المطلوبة (None = الكل).
+    ترجع {اسم المصدر: مجموع الأحداث الجديدة، أو None إذا فشل عند أي تقرير}.
+    """
+    METRICS.begin()
+    snapshot = feeds.HTTP_CACHE.checkpoint()
+    try:
+        with METRICS.capture(METRICS_DIR):
+            return _run_cycle(profiles, states, names, quiet)
+    except BaseException:
+        # تقرير فشل قبل ما يعالج الأخبار: ETag الدورة ما ينحفظ، والجلب الجاي يرجعها
+        feeds.HTTP_CACHE.rollback(snapshot)
+        raise
+    finally:
+        METRICS.write(METRICS_DIR)
+
+
+def _run_cycle(profiles, states, names, quiet):
+    jobs = collect_jobs(profiles, names)
+    max_age = max(p.max_age_days for p in profiles)
+
+    # المصادر تُجلب بالتوازي: مدة التشغيل = أبطأ مصدر وليس مجموعها
+    with METRICS.timer("stage", stage="fetch"):
+        fetched = {
+            feeds.job_key(job): (items, status)
+            for job, (_, items, status) in zip(jobs, feeds.fetch_all(jobs, max_age, METRICS))
+        }
+
+    totals = {}
+    for p in profiles:
+        mine = [j for j in p.build_jobs() if names is None or j[0] in names]
+        if not mine:
+            continue
+        results = [(j[0], *fetched[feeds.job_key(j)]) for j in mine]
+        with METRICS.timer("stage", stage="profile", profile=p.name):
+            counts = p.run_cycle(states[p.name], results, quiet=quiet)
+        for name, n in counts.items():
+            if n is None or totals.get(name, 0) is None:
+                totals[name] = None
+            else:
+                totals[name] = totals.get(name, 0) + n
+    return totals
+
+
+def load_profiles(names=PROFILES):
+    return [ReportProfile(importlib.import_module(n)) for n in names]
+
+
+def main(profiles=None, daemon=False):
+    if profiles is None:
+        profiles = load_profiles()
+    elif len(profiles) < len(PROFILES):
+        # تقرير وحده ياخذ ذاكرة طلبات خاصة: 304 من جلب تقرير ثاني
+        # ما يعني إن هذا التقرير شاف الأخبار
+        feeds.HTTP_CACHE.path = "http_cache_" + "_".join(p.name for p in profiles) + ".json"
+
+    # ملف تالف يرفع خطأ بدل ما نرجع لحالة فارغة ونعيد إرسال القديم
+    store = open_store(STATE_FILE, SEEN_FILE)
+    states = {p.name: p.load_state(store) for p in profiles}
+    feeds.HTTP_CACHE.load()
+    link_canon.LINKS.load()
+    # المصدر الواقف في التشغيل السابق ما ياخذ وقت هذا التشغيل
+    feeds.HEALTH.load(store.shared().get("source_health"))
+
+    def save():
+        for p in profiles:
+            p.dump_state(states[p.name])
+        store.shared()["source_health"] = feeds.HEALTH.dump()
+        store.save()
+        feeds.HTTP_CACHE.save()
+        link_canon.LINKS.save()
+
+    if not daemon:
+        try:
+            run_cycle(profiles, states)
+        finally:
+            # الحفظ حتى لو فشلت الدورة: الرسائل المعلقة في OUTBOX ما تضيع
+            save()
+        return
+
+    # الحالة والاتصالات والمطابقات تبقى في الذاكرة بين الدورات.
+    # فترة كل مصدر = الأقصر بين التقارير اللي تستخدمه
+    intervals = {}
+    for p in profiles:
+        for name, (start, lo, hi) in p.daemon_intervals.items():
+            old = intervals.get(name, (start, lo, hi))
+            intervals[name] = tuple(min(a, b) for a, b in zip(old, (start, lo, hi)))
+    schedules = [
+        SourceSchedule(name, start * 60, lo * 60, hi * 60)
+        for name, (start, lo, hi) in intervals.items()
+    ]
+    run_daemon(
+        schedules,
+        lambda names: run_cycle(profiles, states, names, quiet=True),
+        save,
+        flush_every=DAEMON_FLUSH_MINUTES * 60,
+    )
+
+
+def record(archive, profiles=None, daemon=False):
+    http_client.ARCHIVE = Recorder(archive)
+    try:
+        main(profiles, daemon)
+    finally:
+        http_client.ARCHIVE.close()
+        http_client.ARCHIVE = None
+
+
+def replay(archive, profiles=None, out_dir=None):
+    """
+    دورة من أرشيف مسجّل في مجلد جديد (الحالة الحقيقية ما تتأثر):
+    نفس التحليل والكشف والتقارير، والرسائل تنكتب في telegram.jsonl.
+    ترجع مسار المجلد.
+    """
+    archive = os.path.abspath(archive)
+    out_dir = os.path.abspath(out_dir or tempfile.mkdtemp(prefix="replay-"))
+    os.makedirs(out_dir, exist_ok=True)
+    os.chdir(out_dir)
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "replay")
+    os.environ.setdefault("TELEGRAM_CHAT_ID", "replay")
+
+    replayer = http_client.ARCHIVE = Replayer(archive)
+    # الأرشيف محلي: ما فيه داعي لانتظار محددات المعدل
+    for name in feeds.LIMITS:
+        feeds.LIMITS[name] = TokenBucket(1e9, burst=1e9)
+    try:
+        main(profiles)
+    finally:
+        http_client.ARCHIVE = None
+        replayer.close()
+        with open("telegram.jsonl", "w", encoding="utf-8") as f:
+            for msg in replayer.telegram:
+                f.write(json.dumps(msg, ensure_ascii=False) + "\n")
+    return out_dir
+
+
+def cli(argv=None):
+    ap = argparse.ArgumentParser(description="مشغل التقارير (main + animal_monitor_ar)")
+    ap.add_argument("--daemon", action="store_true", help="تشغيل مستمر")
+    ap.add_argument("--profiles", help="تقارير مفصولة بفواصل (الافتراضي الكل)")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--record", metavar="ARCHIVE", help="حفظ ردود HTTP الخام في أرشيف zip")
+    mode.add_argument("--replay", metavar="ARCHIVE", help="تشغيل دورة من أرشيف بدون شبكة")
+    ap.add_argument("--out", help="مجلد إعادة التشغيل (الافتراضي مجلد مؤقت جديد)")
+    args = ap.parse_args(argv)
+    if args.replay and args.daemon:
+        ap.error("--replay runs a single cycle")
+
+    profiles = load_profiles(args.profiles.split(",")) if args.profiles else None
+    if args.replay:
+        out_dir = replay(args.replay, profiles, args.out)
+        print(f"replay output: {out_dir}")
+    elif args.record:
+        record(args.record, profiles, args.daemon)
+    else:
+        main(profiles, args.daemon)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,131 @@
+import time
+import threading
+
+# =========================
+# صحة المصادر (circuit breaker)
+# =========================
+# لكل مصدر: آخر أزمنة الجلب الناجح، وعدد الفشل المتتالي، وحالة القاطع.
+# - closed: الطلبات عادية، ومهلة القراءة من توزيع الأزمنة الأخيرة
+#   (p95 × هامش، بين حد أدنى وأعلى) بدل 45 ثانية ثابتة.
+# - open: بعد FAIL_THRESHOLD فشل متتالي نتخطى المصدر بدون طلب حتى تنتهي
+#   فترة الانتظار (تتضاعف كل مرة يفتح فيها من جديد، حتى OPEN_MAX_S).
+# - half_open: بعد الانتظار شريحة وحدة للمصدر تجربة (start_probe) قبل الباقي؛
+#   تنجح = closed وكل شرائح المصدر تنجلب في نفس الدورة، تفشل = open.
+# الحالة تنحفظ مع state.json، فالتشغيل الجاي يعرف إن المصدر واقف.
+
+FAIL_THRESHOLD = 3
+OPEN_BASE_S = 15 * 60
+OPEN_MAX_S = 6 * 3600
+LATENCY_WINDOW = 50          # آخر أزمنة نجاح محفوظة لكل مصدر
+MIN_SAMPLES = 5              # أقل من كذا: المهلة الافتراضية
+TIMEOUT_FACTOR = 3.0
+MIN_TIMEOUT_S = 5.0
+MAX_TIMEOUT_S = 45.0         # = http_client.READ_TIMEOUT
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Source:
+    __slots__ = ("latencies", "failures", "state", "open_until", "open_s", "probing")
+
+    def __init__(self, latencies=(), failures=0, state="closed", open_until=0.0, open_s=0.0):
+        self.latencies = list(latencies)[-LATENCY_WINDOW:]
+        self.failures = failures
+        self.state = state
+        self.open_until = open_until
+        self.open_s = open_s
+        self.probing = False
+
+
+class HealthTracker:
+    def __init__(self, clock=time.time):
+        self._sources = {}
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def _get(self, name):
+        s = self._sources.get(name)
+        if s is None:
+            s = self._sources[name] = _Source()
+        return s
+
+    def _refresh(self, s):
+        if s.state == "open" and self._clock() >= s.open_until:
+            s.state = "half_open"
+            s.probing = False
+
+    def allow(self, name):
+        """هل نطلب من المصدر الآن؟ (half_open: لا، حتى تنجح التجربة)"""
+        with self._lock:
+            s = self._get(name)
+            self._refresh(s)
+            return s.state == "closed"
+
+    def start_probe(self, name):
+        """True إذا المصدر في half_open وهذي أول تجربة له (الشريحة تنجلب قبل الباقي)."""
+        with self._lock:
+            s = self._get(name)
+            self._refresh(s)
+            if s.state == "half_open" and not s.probing:
+                s.probing = True
+                return True
+            return False
+
+    def timeout(self, name):
+        """مهلة القراءة بالثواني من أزمنة النجاح الأخيرة، أو None (الافتراضي)."""
+        with self._lock:
+            lat = self._get(name).latencies
+            if len(lat) < MIN_SAMPLES:
+                return None
+            return min(MAX_TIMEOUT_S, max(MIN_TIMEOUT_S, percentile(lat, 0.95) * TIMEOUT_FACTOR))
+
+    def record(self, name, ok, latency=None):
+        """ترجع True إذا القاطع انفتح بهذا الفشل."""
+        with self._lock:
+            s = self._get(name)
+            s.probing = False
+            if ok:
+                if latency is not None:
+                    s.latencies.append(round(latency, 3))
+                    del s.latencies[:-LATENCY_WINDOW]
+                s.failures = 0
+                s.state = "closed"
+                s.open_s = 0.0
+                return False
+            s.failures += 1
+            if s.state == "half_open" or (s.state == "closed" and s.failures >= FAIL_THRESHOLD):
+                s.open_s = min(OPEN_MAX_S, s.open_s * 2 if s.open_s else OPEN_BASE_S)
+                s.open_until = self._clock() + s.open_s
+                s.state = "open"
+                return True
+            return False
+
+    def states(self):
+        with self._lock:
+            return {name: s.state for name, s in self._sources.items()}
+
+    def load(self, data):
+        with self._lock:
+            self._sources = {
+                name: _Source(d.get("latencies", ()), d.get("failures", 0), d.get("state", "closed"),
+                              d.get("open_until", 0.0), d.get("open_s", 0.0))
+                for name, d in (data or {}).items()
+            }
+        return self
+
+    def dump(self):
+        with self._lock:
+            return {
+                name: {
+                    "latencies": s.latencies,
+                    "failures": s.failures,
+                    # تجربة ما خلصت (الدورة انقطعت) تنعاد في التشغيل الجاي
+                    "state": "open" if s.state == "half_open" else s.state,
+                    "open_until": s.open_until,
+                    "open_s": s.open_s,
+                }
+                for name, s in self._sources.items()
+            }
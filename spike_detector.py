@@ -0,0 +1,105 @@
+import math
+import time
+from array import array
+
+# =========================
+# كشف الارتفاع المفاجئ (surge)
+# =========================
+# كل زوج (مرض، دولة) له عدادات يومية في حلقة دائرية (WINDOW يوم) ومعدل
+# أساسي EWMA يتحدث عند إغلاق كل يوم. عدد اليوم الحالي يُقارن بالمعدل
+# (Poisson z = (x - λ) / √λ)، وإذا تجاوز العتبة يطلع تنبيه أعلى التقرير.
+# التحديث تدريجي: كل إشارة O(1)، وكل دورة O(الأزواج) — بدون إعادة مسح التاريخ.
+# اليوم = وقت الاكتشاف (مو وقت النشر)، فالأخبار المتأخرة ما تعدّل أيام مغلقة.
+
+BUCKET_S = 86400
+WINDOW = 28            # أيام محفوظة لكل زوج
+ALPHA = 0.2            # وزن اليوم الأخير في EWMA
+WARMUP_DAYS = 7        # ما ننبه قبل ما يتجمع تاريخ كافي
+MIN_COUNT = 3          # أقل عدد إشارات في اليوم لاعتباره ارتفاع
+Z_THRESHOLD = 3.0
+RATE_FLOOR = 0.2       # أقل معدل أساسي (زوج بدون تاريخ ما يعطي z لا نهائي)
+
+
+class _Series:
+    __slots__ = ("last", "ewma", "alerted", "counts")
+
+    def __init__(self, last, ewma=0.0, alerted=-1, counts=None):
+        self.last = last
+        self.ewma = ewma
+        self.alerted = alerted
+        self.counts = array("I", counts or [0] * WINDOW)
+
+    def advance(self, bucket):
+        """نغلق الأيام من last حتى bucket-1 ونحدث EWMA."""
+        gap = bucket - self.last
+        if gap <= 0:
+            return
+        self.ewma = (1 - ALPHA) * self.ewma + ALPHA * self.counts[self.last % WINDOW]
+        # الأيام الفاضية بين آخر إشارة واليوم: صيغة مغلقة بدل حلقة
+        self.ewma *= (1 - ALPHA) ** (gap - 1)
+        for b in range(self.last + 1, self.last + 1 + min(gap, WINDOW)):
+            self.counts[b % WINDOW] = 0
+        self.last = bucket
+
+
+class SpikeDetector:
+    def __init__(self):
+        self.started = None
+        self._pairs = {}
+        self._touched = set()
+
+    def add(self, disease, country, now=None):
+        bucket = int(now if now is not None else time.time()) // BUCKET_S
+        if self.started is None:
+            self.started = bucket
+        key = f"{disease}|{country}"
+        s = self._pairs.get(key)
+        if s is None:
+            s = self._pairs[key] = _Series(bucket)
+        s.advance(bucket)
+        s.counts[bucket % WINDOW] += 1
+        self._touched.add(key)
+
+    def surges(self, now=None):
+        """
+        [(المرض، الدولة، عدد اليوم، المعدل، z)] للأزواج اللي تحركت في هذي الدورة،
+        من الأعلى z. كل زوج ينبه مرة وحدة في اليوم.
+        """
+        bucket = int(now if now is not None else time.time()) // BUCKET_S
+        out = []
+        if self.started is None or bucket - self.started < WARMUP_DAYS:
+            self._touched.clear()
+            return out
+        for key in self._touched:
+            s = self._pairs[key]
+            s.advance(bucket)
+            x = s.counts[bucket % WINDOW]
+            rate = max(s.ewma, RATE_FLOOR)
+            z = (x - rate) / math.sqrt(rate)
+            if x >= MIN_COUNT and z >= Z_THRESHOLD and s.alerted != bucket:
+                s.alerted = bucket
+                disease, _, country = key.partition("|")
+                out.append((disease, country, x, s.ewma, z))
+        self._touched.clear()
+        out.sort(key=lambda r: r[4], reverse=True)
+        return out
+
+    def load(self, data):
+        data = data or {}
+        self.started = data.get("started")
+        self._pairs = {
+            key: _Series(last, ewma, alerted, counts)
+            for key, (last, ewma, alerted, counts) in (data.get("pairs") or {}).items()
+            if len(counts) == WINDOW
+        }
+        return self
+
+    def dump(self, now=None):
+        # زوج بدون إشارات خلال النافذة ومعدله شبه صفر ما يستاهل الحفظ
+        bucket = int(now if now is not None else time.time()) // BUCKET_S
+        pairs = {}
+        for key, s in self._pairs.items():
+            if bucket - s.last >= WINDOW and s.ewma < 0.01:
+                continue
+            pairs[key] = [s.last, round(s.ewma, 4), s.alerted, s.counts.tolist()]
+        return {"started": self.started, "pairs": pairs}
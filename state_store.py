@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import struct
+import datetime
+import tempfile
+
+# =========================
+# تخزين الحالة
+# =========================
+# - الكتابة ذرية: ملف مؤقت في نفس المجلد ثم os.replace،
+#   فانقطاع التشغيل ما يترك ملف نصف مكتوب.
+# - الملف المفقود = حالة فارغة (أول تشغيل). الملف التالف = خطأ صريح،
+#   لأن التصفير الصامت يعيد إرسال كل الأخبار القديمة للقناة.
+
+KSA_TZ = datetime.timezone(datetime.timedelta(hours=3))
+
+SEEN_MAGIC = b"SEEN"
+SEEN_VERSION = 2
+_HEADER = struct.Struct("<4sBI")    # magic, version, count (v1: سجلات، v2: مساحات أسماء)
+_NS = struct.Struct("<BI")          # طول اسم المساحة، عدد السجلات
+_RECORD = struct.Struct("<8sI")     # sid (8 بايت = 16 hex)، أول ظهور (epoch)
+
+LEGACY_NS = ""                      # بيانات ما قبل مساحات الأسماء
+# sid يعيش أطول من نافذة العمر: فلتر العمر يقبل حتى max_age_days + يوم
+# (pubdate.cutoff)، والخبر ينشاف بعد نشره — لو انحذف sid قبل ما يطلع الخبر
+# من النافذة، نتائج البحث القديمة ترجع وتنرسل مرة ثانية.
+SEEN_MARGIN_DAYS = 2
+
+
+def atomic_write_bytes(path, data):
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path, obj):
+    data = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    atomic_write_bytes(path, data.encode("utf-8"))
+
+
+def read_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _legacy_ts(first_seen):
+    # الصيغة القديمة: "2026-02-28 10:00 بتوقيت السعودية"
+    try:
+        dt = datetime.datetime.strptime((first_seen or "")[:16], "%Y-%m-%d %H:%M")
+        return int(dt.replace(tzinfo=KSA_TZ).timestamp())
+    except ValueError:
+        return int(time.time())
+
+
+class SeenStore:
+    """
+    مجموعة sids المرسلة سابقاً مع وقت أول ظهور (في الذاكرة).
+    تنحذف السجلات الأقدم من max_age_days + SEEN_MARGIN_DAYS عند التحميل والحفظ —
+    فحجم الملف يتبع حجم الأخبار خلال نافذة العمر، مو عمر النظام.
+    """
+
+    def __init__(self, max_age_days, records=None):
+        self.max_age = (max_age_days + SEEN_MARGIN_DAYS) * 86400
+        self._seen = dict(records or {})
+        self.prune()
+
+    def __contains__(self, sid):
+        return bytes.fromhex(sid) in self._seen
+
+    def __len__(self):
+        return len(self._seen)
+
+    def add(self, sid, ts=None):
+        self._seen.setdefault(bytes.fromhex(sid), int(ts if ts is not None else time.time()))
+
+    def merge_legacy(self, seen):
+        """ترحيل state["seen"] من state.json القديم."""
+        for sid, meta in seen.items():
+            ts = _legacy_ts(meta.get("first_seen") if isinstance(meta, dict) else None)
+            self.add(sid, ts)
+
+    def prune(self, now=None):
+        cutoff = int(now if now is not None else time.time()) - self.max_age
+        self._seen = {k: ts for k, ts in self._seen.items() if ts >= cutoff}
+
+    def records(self):
+        self.prune()
+        return self._seen
+
+
+def read_seen(path):
+    """
+    {مساحة: {sid_bytes: ts}} من seen.bin.
+    على القرص لكل مساحة: مصفوفة مرتبة من سجلات ثابتة الطول (12 بايت لكل sid).
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path}: truncated header")
+    magic, version, count = _HEADER.unpack_from(data)
+    if magic != SEEN_MAGIC or version not in (1, 2):
+        raise ValueError(f"{path}: unknown format")
+
+    if version == 1:
+        if len(data) != _HEADER.size + count * _RECORD.size:
+            raise ValueError(f"{path}: size does not match {count} records")
+        return {LEGACY_NS: dict(_RECORD.iter_unpack(data[_HEADER.size:]))}
+
+    out = {}
+    pos = _HEADER.size
+    try:
+        for _ in range(count):
+            name_len, n = _NS.unpack_from(data, pos)
+            pos += _NS.size
+            name = data[pos:pos + name_len].decode("utf-8")
+            pos += name_len
+            end = pos + n * _RECORD.size
+            if end > len(data):
+                raise ValueError
+            out[name] = dict(_RECORD.iter_unpack(data[pos:end]))
+            pos = end
+    except (struct.error, ValueError, UnicodeDecodeError):
+        raise ValueError(f"{path}: truncated namespace table") from None
+    if pos != len(data):
+        raise ValueError(f"{path}: trailing bytes")
+    return out
+
+
+def write_seen(path, namespaces):
+    """namespaces: {مساحة: {sid_bytes: ts}}"""
+    out = bytearray(_HEADER.pack(SEEN_MAGIC, SEEN_VERSION, len(namespaces)))
+    for name in sorted(namespaces):
+        records = sorted(namespaces[name].items())
+        raw = name.encode("utf-8")
+        out += _NS.pack(len(raw), len(records))
+        out += raw
+        for sid, ts in records:
+            out += _RECORD.pack(sid, ts)
+    atomic_write_bytes(path, bytes(out))
+
+
+class StateStore:
+    """
+    مخزن حالة واحد لكل التقارير: state.json + seen.bin، ولكل تقرير
+    مساحة أسماء مستقلة (profile). التقرير ياخذ dict حالته من profile()
+    ويعدله، و save() يكتب الكل مرة وحدة.
+
+    state.json: {"profiles": {"main": {...}, "ar": {...}}, "shared": {...}}
+    shared(): حالة المشغل نفسه (مثل صحة المصادر) خارج مساحات التقارير.
+    الصيغة القديمة (حالة تقرير واحد بدون مساحات) تُستخدم كبداية لأي تقرير
+    ما له حالة خاصة بعد.
+    """
+
+    def __init__(self, state_path, seen_path):
+        self.state_path = state_path
+        self.seen_path = seen_path
+        self._data = {"profiles": {}}
+        self._seen_raw = {}
+        self._profiles = {}
+
+    def load(self):
+        data = read_json(self.state_path, {})
+        if "profiles" not in data:
+            data = {"profiles": {}, "legacy": data}
+        self._data = data
+        self._seen_raw = read_seen(self.seen_path)
+        self._profiles = {}
+        return self
+
+    def profile(self, name, max_age_days):
+        if name in self._profiles:
+            return self._profiles[name]
+
+        known = name in self._data["profiles"]
+        legacy = self._data.get("legacy") or {}
+        state = dict(self._data["profiles"][name] if known else legacy)
+        records = self._seen_raw.get(name)
+        if records is None and not known:
+            records = self._seen_raw.get(LEGACY_NS)
+
+        seen = SeenStore(max_age_days, records)
+        old_seen = state.pop("seen", None)
+        if isinstance(old_seen, dict) and old_seen:
+            seen.merge_legacy(old_seen)
+        state["seen"] = seen
+        self._profiles[name] = state
+        return state
+
+    def shared(self):
+        return self._data.setdefault("shared", {})
+
+    def save(self):
+        namespaces = {
+            name: recs for name, recs in self._seen_raw.items()
+            if name != LEGACY_NS and name not in self._profiles
+        }
+        for name, state in self._profiles.items():
+            namespaces[name] = state["seen"].records()
+            self._data["profiles"][name] = {k: v for k, v in state.items() if k != "seen"}
+        self._data.pop("legacy", None)
+        write_seen(self.seen_path, namespaces)
+        atomic_write_json(self.state_path, self._data)
+
+
+_stores = {}
+
+
+def open_store(state_path, seen_path):
+    """نفس الملفات = نفس المخزن داخل العملية (المشغل المشترك يفتحه مرة وحدة)."""
+    key = (os.path.abspath(state_path), os.path.abspath(seen_path))
+    if key not in _stores:
+        _stores[key] = StateStore(state_path, seen_path).load()
+    return _stores[key]
@@ -0,0 +1,101 @@
+import re
+import time
+import zlib
+import random
+
+# =========================
+# تجميع الأخبار المتشابهة (MinHash + LSH)
+# =========================
+# نفس التفشي يطلع من Google و GDELT و ProMED بروابط وعناوين مختلفة شوي.
+# لكل عنوان نحسب توقيع MinHash على كلماته بعد التنظيف، ونقسم التوقيع
+# لأشرطة (bands): عنوانان يشتركان في شريط واحد = مرشحان للتطابق،
+# ثم نتأكد بتقدير التشابه. كل عنوان = عمليات ثابتة العدد، فالتكلفة خطية.
+
+NUM_PERM = 32
+BANDS = 8                       # 8 أشرطة × 4 صفوف ≈ عتبة تشابه 0.6
+ROWS = NUM_PERM // BANDS
+SIMILARITY = 0.6                # أقل تشابه مقدّر نعتبره نفس القصة
+
+_P = (1 << 61) - 1
+_rng = random.Random(20240601)  # بذرة ثابتة: التواقيع لازم تبقى ثابتة بين التشغيلات
+_PERMS = [(_rng.randrange(1, _P), _rng.randrange(0, _P)) for _ in range(NUM_PERM)]
+
+_STOPWORDS = {
+    "a", "an", "the", "in", "of", "on", "for", "to", "and", "with", "at", "by",
+    "from", "as", "is", "are", "was", "were", "new", "after", "amid", "over", "says",
+}
+_WORD = re.compile(r"[^\W_]+")
+
+
+def title_tokens(title):
+    t = (title or "").lower()
+    # عناوين Google News تنتهي بـ " - اسم الناشر"
+    head, sep, tail = t.rpartition(" - ")
+    if sep and len(tail) <= 40:
+        t = head
+    return {w for w in _WORD.findall(t) if w not in _STOPWORDS}
+
+
+def title_signature(title):
+    tokens = title_tokens(title)
+    if not tokens:
+        return None
+    hashes = [zlib.crc32(w.encode("utf-8")) for w in tokens]
+    return [min((a * x + b) % _P for x in hashes) for a, b in _PERMS]
+
+
+def _similarity(s1, s2):
+    return sum(1 for x, y in zip(s1, s2) if x == y) / NUM_PERM
+
+
+class StoryIndex:
+    """
+    فهرس قصص آخر window_days أيام (يُحفظ في state["stories"]).
+    match(sig, group) يرجع id القصة المطابقة أو None. group (مثل المرض|الدولة)
+    يمنع دمج عنوانين متشابهين لفظياً عن دولتين مختلفتين.
+    """
+
+    def __init__(self, window_days):
+        self.window = window_days * 86400
+        self._stories = {}      # id -> (ts, sig, group)
+        self._bands = {}        # (band, values) -> set(ids)
+
+    def _band_keys(self, sig):
+        for b in range(BANDS):
+            yield (b, tuple(sig[b * ROWS:(b + 1) * ROWS]))
+
+    def add(self, story_id, sig, group="", ts=None):
+        if sig is None:
+            return
+        self._stories[story_id] = (int(ts if ts is not None else time.time()), sig, group)
+        for key in self._band_keys(sig):
+            self._bands.setdefault(key, set()).add(story_id)
+
+    def match(self, sig, group=""):
+        if sig is None:
+            return None
+        best, best_sim = None, SIMILARITY
+        for key in self._band_keys(sig):
+            for story_id in self._bands.get(key, ()):
+                _, other, other_group = self._stories[story_id]
+                if other_group != group:
+                    continue
+                sim = _similarity(sig, other)
+                if sim >= best_sim:
+                    best, best_sim = story_id, sim
+        return best
+
+    def load(self, entries):
+        cutoff = time.time() - self.window
+        for e in entries or []:
+            if e["ts"] >= cutoff:
+                self.add(e["id"], e["sig"], e.get("group", ""), e["ts"])
+        return self
+
+    def dump(self):
+        cutoff = time.time() - self.window
+        return [
+            {"id": sid, "ts": ts, "sig": sig, "group": group}
+            for sid, (ts, sig, group) in self._stories.items()
+            if ts >= cutoff
+        ]
@@ -0,0 +1,94 @@
+import os
+import threading
+from collections import Counter
+
+from state_store import read_json
+
+# =========================
+# اشتراكات المحادثات (فرق بيطرية حسب المرض/الدولة/المنطقة)
+# =========================
+# subscriptions.json: قائمة، كل عنصر محادثة وفلاتر اختيارية:
+#
+#     [{"chat_id": "-100123", "profile": ["main"],
+#       "disease": ["حمّى الوادي المتصدّع (RVF)"], "country": ["السودان", "مصر"]}]
+#
+# الحقل الفاضي أو الغائب = الكل، والقيم داخل الحقل = أي وحدة منها،
+# والحقول مع بعض = كلها لازم تطابق. القيم كما تظهر في التقرير.
+# المحادثة الرئيسية (TELEGRAM_CHAT_ID) تبقى تاخذ التقرير الكامل.
+#
+# فهرس مقلوب: (حقل، قيمة) → الاشتراكات المقيدة بها. الحدث يطابق الاشتراك
+# إذا عدد حقوله المطابقة = عدد الحقول المقيدة في الاشتراك، فتكلفة الحدث
+# على قدر الاشتراكات اللي تذكر قيمه، مو عدد كل الاشتراكات.
+
+SUBSCRIPTIONS_FILE = os.environ.get("MONITOR_SUBSCRIPTIONS", "subscriptions.json")
+FIELDS = ("profile", "disease", "country", "region", "label")
+
+
+def _norm(value):
+    return str(value).strip().casefold()
+
+
+class SubscriptionIndex:
+    def __init__(self, subs=()):
+        self.chats = []        # رقم الاشتراك → chat_id
+        self._needed = []      # رقم الاشتراك → عدد الحقول المقيدة
+        self._always = []      # اشتراكات بدون أي فلتر
+        self._postings = {}    # (حقل، قيمة) → [أرقام الاشتراكات]
+        for i, sub in enumerate(subs):
+            self.chats.append(str(sub["chat_id"]))
+            needed = 0
+            for field in FIELDS:
+                values = sub.get(field) or []
+                if isinstance(values, str):
+                    values = [values]
+                values = {_norm(v) for v in values}
+                if values:
+                    needed += 1
+                for v in values:
+                    self._postings.setdefault((field, v), []).append(i)
+            self._needed.append(needed)
+            if not needed:
+                self._always.append(i)
+
+    def __len__(self):
+        return len(self.chats)
+
+    def match(self, item):
+        """أرقام الاشتراكات المطابقة لـ item (dict بحقول FIELDS، الغائب = لا قيمة)."""
+        hits = Counter()
+        for field in FIELDS:
+            value = item.get(field)
+            if value is not None:
+                hits.update(self._postings.get((field, _norm(value)), ()))
+        return self._always + [i for i, n in hits.items() if n == self._needed[i]]
+
+    def route(self, items, profile):
+        """{chat_id: [items]} بترتيب items، بدون تكرار لو المحادثة لها أكثر من اشتراك."""
+        out = {}
+        for item in items:
+            matched = sorted(self.match({**item, "profile": profile}))
+            for chat_id in dict.fromkeys(self.chats[i] for i in matched):
+                out.setdefault(chat_id, []).append(item)
+        return out
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def current(path=None):
+    """
+    الفهرس من الملف، يُبنى مرة ويُعاد بناؤه إذا تغير الملف
+    (daemon ياخذ تعديلات الاشتراكات بدون إعادة تشغيل). ملف غير موجود = بدون اشتراكات.
+    """
+    path = path or SUBSCRIPTIONS_FILE
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is None or cached[0] != mtime:
+            subs = read_json(path, []) if mtime is not None else []
+            cached = _cache[path] = (mtime, SubscriptionIndex(subs))
+        return cached[1]
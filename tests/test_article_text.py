@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+import article_text
+from article_text import ArticleCache, article_texts
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ArticleCache(str(tmp_path / "articles.db"))
+    yield c
+    c.close()
+
+
+def test_display_variants_share_one_cached_article(cache, monkeypatch):
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return "Outbreak text"
+
+    monkeypatch.setattr(article_text, "fetch_article", fetch)
+    links = ["http://www.fao.org/news/1/", "https://fao.org/news/1?utm_source=x"]
+    assert article_texts(links, cache=cache) == dict.fromkeys(links, "Outbreak text")
+    # نفس الرابط الموحد: جلب واحد برابط العرض الأول
+    assert fetched == ["http://www.fao.org/news/1/"]
+
+    assert article_texts(["https://www.fao.org/news/1#top"], cache=cache) == {
+        "https://www.fao.org/news/1#top": "Outbreak text",
+    }
+    assert len(fetched) == 1
+
+
+def test_slow_page_does_not_hold_the_cycle(cache, monkeypatch):
+    def fetch(url):
+        time.sleep(0.5 if "slow" in url else 0)
+        return url
+
+    monkeypatch.setattr(article_text, "fetch_article", fetch)
+    t0 = time.monotonic()
+    texts = article_texts(["https://a.org/fast", "https://a.org/slow"], cache=cache, budget_s=0.1)
+    assert time.monotonic() - t0 < 0.4
+    assert texts == {"https://a.org/fast": "https://a.org/fast"}
+    # الصفحة المتأخرة ما تنحفظ وتنجرب الدورة الجاية
+    assert cache.get_many(["https://a.org/slow"]) == {}
@@ -0,0 +1,60 @@
+import datetime
+
+from event_backlog import Backlog
+
+NOW = datetime.datetime(2026, 3, 10, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def _event(sid, days_old):
+    pub = NOW - datetime.timedelta(days=days_old)
+    return {"sid": sid, "pub_ts": int(pub.timestamp())}
+
+
+def test_pop_orders_by_score_then_oldest_queued():
+    b = Backlog(7)
+    b.push(_event("low", 1), 1, queued=100)
+    b.push(_event("late", 1), 5, queued=300)
+    b.push(_event("early", 1), 5, queued=200)
+    assert [e["sid"] for e in b.pop(2, NOW)] == ["early", "late"]
+    assert [e["sid"] for e in b.events()] == ["low"]
+
+
+def test_full_backlog_evicts_worst():
+    b = Backlog(7, capacity=2)
+    assert b.push(_event("a", 1), 3) is None
+    assert b.push(_event("b", 1), 1) is None
+    assert b.push(_event("c", 1), 2)["sid"] == "b"
+    assert b.push(_event("d", 1), 0)["sid"] == "d"
+
+
+def test_load_expires_on_publication_date_not_queue_time():
+    # خبر انضاف للانتظار اليوم لكن منشور قبل 20 يوم ما يرجع
+    queued = int(NOW.timestamp())
+    entries = [
+        {"score": 1, "queued": queued, "event": _event("old", 20)},
+        {"score": 1, "queued": queued - 30 * 86400, "event": _event("fresh", 2)},
+        {"score": 1, "queued": queued, "event": {"sid": "undated", "pub_ts": None}},
+    ]
+    assert [e["sid"] for e in Backlog(7).load(entries, NOW).events()] == ["fresh"]
+
+
+def test_expired_entries_do_not_evict_fresh_on_load():
+    entries = [{"score": 9, "queued": 0, "event": _event(f"old{n}", 30)} for n in range(3)]
+    entries.append({"score": 1, "queued": 0, "event": _event("fresh", 1)})
+    assert [e["sid"] for e in Backlog(7, capacity=1).load(entries, NOW).events()] == ["fresh"]
+
+
+def test_pop_drops_events_that_aged_out_while_waiting():
+    b = Backlog(7).load([{"score": 5, "queued": 0, "event": _event("ageing", 7)}], NOW)
+    b.push(_event("new", 0), 1)
+    assert [e["sid"] for e in b.pop(5, NOW + datetime.timedelta(days=2))] == ["new"]
+    assert len(b) == 0
+
+
+def test_dump_load_round_trip():
+    b = Backlog(7)
+    b.push(_event("a", 1), 2, queued=50)
+    b.push(_event("b", 2), 3, queued=60)
+    dumped = b.dump()
+    assert [d["event"]["sid"] for d in dumped] == ["b", "a"]
+    assert Backlog(7).load(dumped, NOW).dump() == dumped
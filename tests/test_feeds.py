@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+import feeds
+from http_cache import HttpCache
+from run_metrics import RunMetrics
+from source_health import HealthTracker
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    c = HttpCache(str(tmp_path / "http_cache.json"))
+    monkeypatch.setattr(feeds, "HTTP_CACHE", c)
+    return c
+
+
+def _fetch(key, delay):
+    def fetch(*, max_age_days, metrics, timeout=None):
+        time.sleep(delay)
+        return [{"link": key, "title": key}], (key, {"etag": "v1", "last_modified": None})
+    return fetch
+
+
+def test_validators_recorded_for_finished_fetch(cache):
+    results = feeds.fetch_all([("A", _fetch("a", 0))], 30, RunMetrics("t"), health=HealthTracker())
+    assert results[0][2] == "OK"
+    assert cache._entries == {"a": {"etag": "v1", "last_modified": None}}
+
+
+def test_late_fetch_does_not_record_validators(cache):
+    # الجلب المتأخر انرمت أخباره: لو سجل ETag، الطلب الجاي ياخذ 304 وتضيع
+    jobs = [("A", _fetch("late", 0.5))]
+    results = feeds.fetch_all(jobs, 30, RunMetrics("t"), deadline=0.1, health=HealthTracker())
+    assert results[0][2] == "Timeout"
+    time.sleep(1)
+    assert cache._entries == {}
+
+
+def _opened(name, clock):
+    health = HealthTracker(clock=lambda: clock[0])
+    for _ in range(3):
+        health.record(name, False)
+    return health
+
+
+def test_successful_probe_admits_every_shard(cache):
+    # 21 شريحة لنفس المصدر: بعد نجاح التجربة كلها تنجلب، مو وحدة فقط
+    clock = [1000.0]
+    health = _opened("Google", clock)
+    jobs = [("Google", _fetch(f"g{n}", 0)) for n in range(21)]
+    assert {s for _, _, s in feeds.fetch_all(jobs, 30, RunMetrics("t"), health=health)} == {"CircuitOpen"}
+
+    clock[0] += 3600
+    results = feeds.fetch_all(jobs, 30, RunMetrics("t"), health=health)
+    assert [s for _, _, s in results] == ["OK"] * 21
+    assert health.states() == {"Google": "closed"}
+
+
+def test_failed_probe_skips_remaining_shards(cache):
+    def broken(*, max_age_days, metrics, timeout=None):
+        raise ConnectionError("down")
+
+    clock = [1000.0]
+    health = _opened("Google", clock)
+    clock[0] += 3600
+    jobs = [("Google", broken)] * 5
+    results = feeds.fetch_all(jobs, 30, RunMetrics("t"), health=health)
+    assert [s for _, _, s in results] == ["ConnectionError"] + ["CircuitOpen"] * 4
+    assert health.states() == {"Google": "open"}
+
+
+def test_latency_excludes_rate_limit_wait(cache, monkeypatch):
+    class SlowBucket:
+        def acquire(self):
+            time.sleep(0.3)
+            return 0.3
+
+    def throttled(*, max_age_days, metrics, timeout=None):
+        feeds._throttle(metrics, "A")
+        return [], ("a", {"etag": None, "last_modified": None})
+
+    monkeypatch.setitem(feeds.LIMITS, "A", SlowBucket())
+    health = HealthTracker()
+    feeds.fetch_all([("A", throttled)], 30, RunMetrics("t"), health=health)
+    assert health.dump()["A"]["latencies"][0] < 0.1
+
+
+def test_merge_results_drops_cross_shard_duplicates():
+    a = {"link": "https://x/1", "title": "one"}
+    b = {"link": "", "title": "no link"}
+    results = [
+        ("Google", [a, b], "OK"),
+        ("Google", [dict(a), dict(b), {"link": "https://x/2", "title": "two"}], "OK"),
+        ("GDELT", None, "Timeout"),
+    ]
+    items, notes = feeds.merge_results(results)
+    assert [it["title"] for it in items] == ["one", "no link", "two"]
+    assert notes == ["Google=OK", "GDELT=Timeout"]
+
+
+def test_merge_results_counts_mixed_shard_statuses():
+    results = [("Google", [], "OK")] * 12 + [("Google", None, "Timeout")] * 2
+    assert feeds.merge_results(results)[1] == ["Google=OK×12،Timeout×2"]
+    assert feeds.sources_ok(results) == {"Google": True}
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+import gazetteer
+from gazetteer import Gazetteer
+
+ROWS = [
+    "# الدولة\tالمستوى\tالاسم العربي\tالأسماء البديلة",
+    "السودان\t1\tدارفور\tdarfur",
+    "السودان\t1\tشمال دارفور\tnorth darfur|northern darfur",
+    "تشاد\t1\tوداي\touaddai|wadai",
+    "السودان\t2\tوداي السودانية\twadai",
+]
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "gazetteer.tsv"
+    path.write_text("\n".join(ROWS) + "\n", encoding="utf-8")
+    return path
+
+
+def test_longest_name_wins(data_file):
+    g = Gazetteer(str(data_file))
+    assert g.find("Outbreak in North Darfur state")[0] == ("السودان", 1, "شمال دارفور")
+    assert g.region("Outbreak in North Darfur state", "السودان") == "شمال دارفور"
+    assert g.region("Outbreak in Darfur", "السودان") == "دارفور"
+
+
+def test_region_restricted_to_country(data_file):
+    g = Gazetteer(str(data_file))
+    assert g.region("Cases reported in Wadai", "تشاد") == "وداي"
+    assert g.region("Cases reported in Wadai", "السودان") == "وداي السودانية"
+    assert g.region("Cases reported in Wadai", "كينيا") is None
+
+
+def test_shipped_gazetteer_prefers_north_darfur():
+    assert gazetteer.GAZETTEER.region("PPR in north darfur", "السودان") == "شمال دارفور"
+
+
+def test_index_rebuilt_on_size_change_alone(data_file):
+    g = Gazetteer(str(data_file))
+    assert g.region("Outbreak in Kutum", "السودان") is None
+    assert os.path.exists(g.index_path)
+
+    st = os.stat(data_file)
+    with open(data_file, "a", encoding="utf-8") as f:
+        f.write("السودان\t2\tكتم\tkutum\n")
+    # نفس mtime (نسخ يحفظ الوقت مثلاً): الحجم وحده يكفي لإعادة البناء
+    os.utime(data_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert Gazetteer(str(data_file)).region("Outbreak in Kutum", "السودان") == "كتم"
+
+
+def test_index_rebuilt_on_mtime_change_alone(data_file):
+    Gazetteer(str(data_file)).find("darfur")
+    # نفس الحجم بالضبط، محتوى مختلف: الفهرس القديم ما ينفع
+    text = data_file.read_text(encoding="utf-8").replace("wadai", "wadae")
+    st = os.stat(data_file)
+    data_file.write_text(text, encoding="utf-8")
+    os.utime(data_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert os.stat(data_file).st_size == st.st_size
+    assert Gazetteer(str(data_file)).region("in Wadae", "تشاد") == "وداي"
+
+
+def test_read_only_folder_falls_back_to_memory(data_file, monkeypatch):
+    def refuse(path, data):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(gazetteer, "atomic_write_bytes", refuse)
+    g = Gazetteer(str(data_file))
+    assert g.region("North Darfur", "السودان") == "شمال دارفور"
+    assert not os.path.exists(g.index_path)
+    assert len(g) == 4
@@ -0,0 +1,67 @@
+import random
+import re
+
+import pytest
+
+import main
+import animal_monitor_ar
+from keyword_matcher import KeywordMatcher
+from report_profile import ReportProfile
+
+
+def _first_key(keys, low, bounded=False):
+    # الحلقة القديمة: أول مفتاح (بترتيب القاموس) موجود في النص
+    for k in keys:
+        if re.search(rf"\b{re.escape(k)}\b", low) if bounded else k in low:
+            return k
+    return None
+
+
+def _expected(groups, text, bounded):
+    low = text.lower()
+    out = {}
+    for group, keys in groups.items():
+        k = _first_key(keys, low, group in bounded)
+        if k is not None:
+            out[group] = k
+    return out
+
+
+def test_first_key_in_dict_order_wins():
+    m = KeywordMatcher({"country": {"sudan": 1, "south sudan": 2}})
+    # "south sudan" أطول وأسبق في النص، لكن "sudan" أسبق في القاموس
+    assert m.scan("Outbreak in South Sudan") == {"country": "sudan"}
+
+
+def test_overlapping_and_prefix_keys():
+    groups = {"region": {"north darfur": 1, "darfur": 2}, "disease": {"avian influenza": 1, "avian": 2}}
+    m = KeywordMatcher(groups)
+    assert m.scan("north darfur avian influenza") == {"region": "north darfur", "disease": "avian influenza"}
+    assert m.scan("darfur avian flu") == {"region": "darfur", "disease": "avian"}
+
+
+def test_bounded_group_needs_whole_word():
+    m = KeywordMatcher({"abbr": {"rvf": 1, "fmd": 2}}, bounded={"abbr"})
+    assert m.scan("rvfv genome; fmd_x") == {}
+    assert m.scan("(RVF) and FMD.") == {"abbr": "rvf"}
+
+
+@pytest.mark.parametrize("config", [main, animal_monitor_ar], ids=["main", "ar"])
+def test_scan_matches_per_key_loops(config):
+    profile = ReportProfile(config)
+    groups = {
+        "country": config.COUNTRY_KEYS,
+        "disease": config.DISEASE_FULL,
+        "abbr": config.DISEASE_ABBR,
+        "context": config.DISEASE_CONTEXT,
+    }
+    groups.update((label, keys) for label, keys in config.LABEL_RULES)
+    vocab = [k for keys in groups.values() for k in keys] + ["the", "xrvf", "in", "_", ",", "2026"]
+    rng = random.Random(7)
+    for _ in range(500):
+        text = " ".join(rng.choice(vocab) for _ in range(rng.randint(1, 8)))
+        if rng.random() < 0.3:
+            text = text.replace(" ", "")
+        got = profile.matcher.scan(text.upper() if rng.random() < 0.2 else text)
+        got = {g: k for g, k in got.items() if g in groups}
+        assert got == _expected(groups, text, {"abbr"}), text
@@ -0,0 +1,22 @@
+from link_canon import LinkCache, clean_link, resolve_links, strip_tracking
+
+
+def test_clean_link_only_drops_tracking_params():
+    url = "http://www.example.org/news/item/?id=5&utm_source=tw&ref=home#top"
+    assert clean_link(url) == "http://www.example.org/news/item/?id=5#top"
+    assert strip_tracking(url) == "https://example.org/news/item?id=5"
+
+
+def test_display_link_keeps_original_form(tmp_path):
+    links = resolve_links(["http://www.fao.org/a/?ref=1"], cache=LinkCache(str(tmp_path / "c.json")))
+    assert links == {"http://www.fao.org/a/?ref=1": ("http://www.fao.org/a/", "https://fao.org/a")}
+
+
+def test_cached_redirect_gives_target_and_same_sid_key(tmp_path):
+    cache = LinkCache(str(tmp_path / "c.json"))
+    google = "https://news.google.com/rss/articles/abc?oc=5"
+    cache.put(strip_tracking(google), "https://www.who.int/news/item/")
+    links = resolve_links([google, "https://www.who.int/news/item/?utm_medium=rss"], cache=cache)
+    assert links[google] == ("https://www.who.int/news/item/", "https://who.int/news/item")
+    # نفس المقال من مصدرين = نفس المفتاح الموحد
+    assert len({canonical for _, canonical in links.values()}) == 1
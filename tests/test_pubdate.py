@@ -0,0 +1,61 @@
+import datetime
+
+import pytest
+
+from pubdate import cutoff, parse_pub, stamp, timestamp
+
+UTC = datetime.timezone.utc
+
+
+def _utc(*args):
+    return datetime.datetime(*args, tzinfo=UTC)
+
+
+@pytest.mark.parametrize("pub, expected", [
+    # RFC 822 (Google/ProMED)
+    ("Sat, 28 Feb 2026 00:00:00 GMT", _utc(2026, 2, 28)),
+    ("Sat, 28 Feb 2026 03:00:00 +0300", _utc(2026, 2, 28)),
+    ("Fri, 27 Feb 2026 19:00:00 EST", _utc(2026, 2, 28)),
+    ("28 Feb 2026 00:00 UT", _utc(2026, 2, 28)),
+    ("Saturday, 28 February 2026 00:00:00 -0130", _utc(2026, 2, 28, 1, 30)),
+    ("Sat, 28 Feb 2026 00:00:00 XYZ", _utc(2026, 2, 28)),
+    ("Sat, 28 Feb 2026 00:00:00", _utc(2026, 2, 28)),
+    # ISO 8601
+    ("2026-02-28T00:00:00Z", _utc(2026, 2, 28)),
+    ("2026-02-28T03:00:00+03:00", _utc(2026, 2, 28)),
+    ("2026-02-27T21:00:00-0300", _utc(2026, 2, 28)),
+    ("2026-02-28T00:00:00.123456Z", _utc(2026, 2, 28)),
+    ("2026-02-28 00:00", _utc(2026, 2, 28)),
+    ("2026-02-28", _utc(2026, 2, 28)),
+    # GDELT seendate
+    ("20260228T000000Z", _utc(2026, 2, 28)),
+    # ثانية كبيسة تنقص لـ 59
+    ("2026-02-28T23:59:60Z", _utc(2026, 2, 28, 23, 59, 59)),
+    ("  2026-02-28  ", _utc(2026, 2, 28)),
+])
+def test_formats(pub, expected):
+    assert parse_pub(pub) == expected
+
+
+@pytest.mark.parametrize("pub", [
+    None, "", "   ", "yesterday", "2026-02-30", "2026-13-01", "2026-02-28T24:00:00Z",
+    "20260230T000000Z", "Sat, 31 Apr 2026 00:00:00 GMT", "Sat, 28 Foo 2026 00:00:00 GMT",
+    "Sat, 28 Feb 2026 00:61:00 GMT", "2026-02-28T00:00:00Z trailing",
+])
+def test_invalid_dates(pub):
+    assert parse_pub(pub) is None
+
+
+def test_cutoff_allows_full_days():
+    now = _utc(2026, 3, 10, 12)
+    assert cutoff(7, now) == _utc(2026, 3, 2, 12)
+    assert parse_pub("2026-03-02T12:00:01Z") > cutoff(7, now)
+
+
+def test_stamp_parses_once():
+    item = {"pub": "20260228T000000Z"}
+    assert stamp(item) == _utc(2026, 2, 28)
+    item["pub"] = "garbage"
+    assert stamp(item) == _utc(2026, 2, 28)
+    assert timestamp(item["pub_dt"]) == int(_utc(2026, 2, 28).timestamp())
+    assert timestamp(stamp({"pub": ""})) is None
@@ -0,0 +1,22 @@
+from query_planner import or_group, shard_queries
+
+
+def test_or_group_quotes_phrases():
+    assert or_group(["rabies"]) == "rabies"
+    assert or_group(["foot and mouth", "FMD"]) == '("foot and mouth" OR FMD)'
+
+
+def test_shards_are_disease_groups_times_country_batches():
+    queries = shard_queries([["rabies"], ["anthrax", "PPR"]], ["India", "Sudan", "South Africa"], 2)
+    assert queries == [
+        "rabies (India OR Sudan)",
+        'rabies "South Africa"',
+        "(anthrax OR PPR) (India OR Sudan)",
+        '(anthrax OR PPR) "South Africa"',
+    ]
+
+
+def test_same_groups_give_same_queries():
+    # التقارير تشارك الجلب إذا طلعت نفس النصوص
+    args = ([["rabies", "lyssa"]], ["Kenya", "Chad"])
+    assert shard_queries(*args) == shard_queries(*args) == ["(rabies OR lyssa) Kenya", "(rabies OR lyssa) Chad"]
@@ -0,0 +1,36 @@
+import pytest
+
+import main
+import animal_monitor_ar
+from report_profile import REGION_DEFAULT, ReportProfile
+
+
+@pytest.fixture(params=[main, animal_monitor_ar], ids=["main", "ar"])
+def profile(request):
+    return ReportProfile(request.param)
+
+
+def _event(profile, title):
+    return {
+        "title": title,
+        "disease": profile.detect_disease(title),
+        "country": profile.detect_country(title),
+        "region": REGION_DEFAULT,
+    }
+
+
+@pytest.mark.parametrize("title, article", [
+    ("PPR outbreak confirmed in Sudan", "Rift valley fever was also reported in Sudan last year."),
+    ("Rabies cases in India", "Meanwhile avian influenza continues to spread in India."),
+])
+def test_enrich_keeps_disease_when_article_mentions_another(profile, title, article):
+    event = _event(profile, title)
+    before = event["disease"]
+    profile.enrich_event(event, article)
+    assert event["disease"] == before
+
+
+def test_enrich_upgrades_abbreviation_to_same_disease(profile):
+    event = _event(profile, "H5N1 outbreak confirmed in India")
+    assert profile.enrich_event(event, "Highly pathogenic avian influenza was found on farms in India.")
+    assert event["disease"] == main.DISEASE_FULL["highly pathogenic avian influenza"]
@@ -0,0 +1,27 @@
+import http_client
+from run_metrics import RunMetrics
+
+
+def _series(text):
+    return [line.rsplit(" ", 1)[0] for line in text.splitlines()]
+
+
+def test_host_stats_written_once_with_profile_label(monkeypatch, tmp_path):
+    monkeypatch.setattr(http_client, "_stats", {})
+    http_client._record("api.gdeltproject.org", 0.5, ok=True)
+    runner = RunMetrics("runner")
+    profiles = [RunMetrics("main", hosts=False), RunMetrics("ar", hosts=False)]
+    for m in [runner, *profiles]:
+        m.incr("events_new", 2)
+        m.write(str(tmp_path))
+
+    files = {m.profile: (tmp_path / f"{m.profile}.prom").read_text() for m in [runner, *profiles]}
+    host_lines = [line for text in files.values() for line in text.splitlines() if "host=" in line]
+    assert host_lines == [
+        'animal_monitor_http_requests_total{host="api.gdeltproject.org",profile="runner"} 1',
+        'animal_monitor_http_errors_total{host="api.gdeltproject.org",profile="runner"} 0',
+        'animal_monitor_http_seconds_total{host="api.gdeltproject.org",profile="runner"} 0.500',
+    ]
+    # ولا سلسلة تتكرر بين ملفات textfile
+    series = [s for text in files.values() for s in _series(text)]
+    assert len(series) == len(set(series))
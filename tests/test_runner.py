@@ -0,0 +1,49 @@
+import pytest
+
+import feeds
+import runner
+from http_cache import HttpCache
+from source_health import HealthTracker
+
+
+class FakeProfile:
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.max_age_days = 30
+        self.fail = fail
+
+    def build_jobs(self):
+        def fetch(*, max_age_days, metrics, timeout=None):
+            return [{"link": "a", "title": "a"}], ("a", {"etag": "v2", "last_modified": None})
+        return [("A", fetch)]
+
+    def run_cycle(self, state, results, quiet=False):
+        if self.fail:
+            raise RuntimeError("profile failed")
+        return {"A": 1}
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    c = HttpCache(str(tmp_path / "http_cache.json"))
+    c._entries = {"a": {"etag": "v1", "last_modified": None}}
+    monkeypatch.setattr(feeds, "HTTP_CACHE", c)
+    monkeypatch.setattr(feeds, "HEALTH", HealthTracker())
+    monkeypatch.setattr(runner, "METRICS_DIR", str(tmp_path / "metrics"))
+    return c
+
+
+def test_successful_cycle_keeps_new_validators(cache):
+    profiles = [FakeProfile("main"), FakeProfile("ar")]
+    assert runner.run_cycle(profiles, {"main": {}, "ar": {}}) == {"A": 2}
+    assert cache._entries == {"a": {"etag": "v2", "last_modified": None}}
+
+
+def test_failed_profile_rolls_back_validators(cache):
+    # الحالة تنحفظ رغم الفشل؛ لو بقى v2 الطلب الجاي ياخذ 304 وأخبار ar تضيع
+    profiles = [FakeProfile("main"), FakeProfile("ar", fail=True)]
+    with pytest.raises(RuntimeError):
+        runner.run_cycle(profiles, {"main": {}, "ar": {}})
+    assert cache._entries == {"a": {"etag": "v1", "last_modified": None}}
+    cache.save()
+    assert HttpCache(cache.path).load()._entries == {"a": {"etag": "v1", "last_modified": None}}
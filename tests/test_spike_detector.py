@@ -0,0 +1,90 @@
+import pytest
+
+from spike_detector import ALPHA, BUCKET_S, WARMUP_DAYS, WINDOW, SpikeDetector
+
+DAY0 = 20_000 * BUCKET_S   # بداية يوم
+
+
+def _day(n, hour=12):
+    return DAY0 + n * BUCKET_S + hour * 3600
+
+
+def _add(det, n, day, pair=("FMD", "Kenya")):
+    for _ in range(n):
+        det.add(*pair, now=_day(day))
+
+
+def test_ewma_decays_over_empty_days():
+    det = SpikeDetector()
+    _add(det, 10, 0)
+    _add(det, 1, 3)
+    # اليوم 0 ينغلق بعشرة، ويومين فاضيين (1 و 2) بصيغة مغلقة
+    s = det._pairs["FMD|Kenya"]
+    assert s.ewma == pytest.approx(ALPHA * 10 * (1 - ALPHA) ** 2)
+    assert s.last == DAY0 // BUCKET_S + 3
+    assert s.counts[s.last % WINDOW] == 1
+    # اليوم 0 يبقى في النافذة، والأيام الفاضية أصفار
+    assert s.counts[(s.last - 3) % WINDOW] == 10
+    assert sum(s.counts) == 11
+
+
+def test_long_gap_clears_whole_window():
+    det = SpikeDetector()
+    _add(det, 5, 0)
+    _add(det, 2, 100)
+    assert sum(det._pairs["FMD|Kenya"].counts) == 2
+
+
+def test_no_alert_during_warmup():
+    det = SpikeDetector()
+    _add(det, 1, 0)
+    _add(det, 20, WARMUP_DAYS - 1)
+    assert det.surges(now=_day(WARMUP_DAYS - 1)) == []
+
+
+def test_surge_alerts_once_per_day():
+    det = SpikeDetector()
+    for day in range(WARMUP_DAYS + 1):
+        _add(det, 1, day)
+    _add(det, 12, WARMUP_DAYS + 1)
+    [(disease, country, x, rate, z)] = det.surges(now=_day(WARMUP_DAYS + 1))
+    assert (disease, country, x) == ("FMD", "Kenya", 12)
+    assert z >= 3
+
+    # دورة ثانية بنفس اليوم: العدد زاد لكن ما نعيد التنبيه
+    _add(det, 5, WARMUP_DAYS + 1)
+    assert det.surges(now=_day(WARMUP_DAYS + 1, hour=18)) == []
+    # اليوم الجاي تنبيه جديد إذا استمر الارتفاع
+    _add(det, 40, WARMUP_DAYS + 2)
+    assert [r[:2] for r in det.surges(now=_day(WARMUP_DAYS + 2))] == [("FMD", "Kenya")]
+
+
+def test_only_pairs_touched_this_cycle_are_checked():
+    det = SpikeDetector()
+    _add(det, 1, 0)
+    _add(det, 20, WARMUP_DAYS + 1)
+    det.surges(now=_day(WARMUP_DAYS + 1))
+    _add(det, 1, WARMUP_DAYS + 1, pair=("Rabies", "India"))
+    assert det.surges(now=_day(WARMUP_DAYS + 1)) == []
+
+
+def test_dump_load_round_trip():
+    det = SpikeDetector()
+    _add(det, 3, 0)
+    _add(det, 4, 2, pair=("PPR", "Sudan"))
+    _add(det, 2, 5)
+    dumped = det.dump(now=_day(5))
+    again = SpikeDetector().load(dumped)
+    assert again.dump(now=_day(5)) == dumped
+    assert again.started == det.started
+    # الحالة المحملة تكمل من نفس النقطة
+    _add(det, 1, 6)
+    _add(again, 1, 6)
+    assert again.dump(now=_day(6)) == det.dump(now=_day(6))
+
+
+def test_dump_drops_silent_pairs():
+    det = SpikeDetector()
+    _add(det, 1, 0)
+    _add(det, 1, 200, pair=("PPR", "Sudan"))
+    assert list(det.dump(now=_day(200))["pairs"]) == ["PPR|Sudan"]
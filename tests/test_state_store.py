@@ -0,0 +1,106 @@
+import datetime
+import json
+import time
+
+import pytest
+
+import pubdate
+from state_store import (
+    _HEADER, _RECORD, LEGACY_NS, SEEN_MAGIC, SeenStore, StateStore, read_seen, write_seen,
+)
+
+DAY = 86400
+
+
+def test_seen_outlives_age_filter():
+    # خبر في آخر نافذة العمر انشاف بعد نشره بساعة: لازم يبقى seen ما دام
+    # فلتر العمر يقبله، وإلا نتائج البحث القديمة تنرسل مرة ثانية
+    max_age = 120
+    now = datetime.datetime(2026, 10, 1, tzinfo=datetime.timezone.utc)
+    pub = pubdate.cutoff(max_age, now) + datetime.timedelta(seconds=1)
+    assert pub > pubdate.cutoff(max_age, now)
+
+    seen = SeenStore(max_age)
+    seen.add("00" * 8, ts=int(pub.timestamp()) + 3600)
+    seen.prune(now=now.timestamp())
+    assert "00" * 8 in seen
+
+
+def test_seen_expires_after_window():
+    seen = SeenStore(120)
+    seen.add("11" * 8, ts=0)
+    seen.prune(now=200 * DAY)
+    assert "11" * 8 not in seen
+
+
+def _sid(n):
+    return bytes([n]) * 8
+
+
+def test_seen_bin_round_trip(tmp_path):
+    path = str(tmp_path / "seen.bin")
+    namespaces = {"main": {_sid(2): 20, _sid(1): 10}, "ar": {}, "عربي": {_sid(3): 30}}
+    write_seen(path, namespaces)
+    assert read_seen(path) == namespaces
+    assert read_seen(str(tmp_path / "missing.bin")) == {}
+
+
+def _write_v1(path, records):
+    data = _HEADER.pack(SEEN_MAGIC, 1, len(records))
+    data += b"".join(_RECORD.pack(sid, ts) for sid, ts in records.items())
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_v1_file_migrates_to_profiles(tmp_path):
+    seen_path = str(tmp_path / "seen.bin")
+    state_path = str(tmp_path / "state.json")
+    now = int(time.time())
+    _write_v1(seen_path, {_sid(1): now})
+    assert read_seen(seen_path) == {LEGACY_NS: {_sid(1): now}}
+    # state.json قديم بدون مساحات وفيه seen بالصيغة الأقدم
+    with open(state_path, "w") as f:
+        json.dump({"seen": {"02" * 8: {"first_seen": "2026-02-28 10:00 بتوقيت السعودية"}}}, f)
+
+    store = StateStore(state_path, seen_path).load()
+    main = store.profile("main", 10000)
+    ar = store.profile("ar", 10000)
+    for seen in (main["seen"], ar["seen"]):
+        assert "01" * 8 in seen and "02" * 8 in seen
+    store.save()
+
+    namespaces = read_seen(seen_path)
+    assert set(namespaces) == {"main", "ar"}
+    assert namespaces["main"][_sid(2)] == int(datetime.datetime(
+        2026, 2, 28, 7, tzinfo=datetime.timezone.utc).timestamp())
+    with open(state_path) as f:
+        assert "seen" not in json.load(f)["profiles"]["main"]
+
+
+def _valid_v2():
+    data = _HEADER.pack(SEEN_MAGIC, 2, 1)
+    data += bytes([4]) + (2).to_bytes(4, "little") + b"main"
+    return data + _RECORD.pack(_sid(1), 1) + _RECORD.pack(_sid(2), 2)
+
+
+def test_hand_built_v2_parses(tmp_path):
+    path = tmp_path / "seen.bin"
+    path.write_bytes(_valid_v2())
+    assert read_seen(str(path)) == {"main": {_sid(1): 1, _sid(2): 2}}
+
+
+@pytest.mark.parametrize("data, error", [
+    (b"SEE", "truncated header"),
+    (b"NOPE" + bytes(5), "unknown format"),
+    (_HEADER.pack(SEEN_MAGIC, 3, 0), "unknown format"),
+    (_HEADER.pack(SEEN_MAGIC, 1, 2) + _RECORD.pack(_sid(1), 1), "size does not match"),
+    (_valid_v2()[:-1], "truncated namespace table"),
+    (_valid_v2()[:_HEADER.size + 3], "truncated namespace table"),
+    (_HEADER.pack(SEEN_MAGIC, 2, 2) + _valid_v2()[_HEADER.size:], "truncated namespace table"),
+    (_valid_v2() + b"x", "trailing bytes"),
+])
+def test_corrupt_seen_bin_raises(tmp_path, data, error):
+    path = tmp_path / "seen.bin"
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match=error):
+        read_seen(str(path))
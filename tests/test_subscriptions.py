@@ -0,0 +1,49 @@
+import os
+import json
+
+import subscriptions
+from subscriptions import SubscriptionIndex
+
+EVENT = {"disease": "الحمّى القلاعية (FMD)", "country": "كينيا", "region": "داخل الدولة", "label": "🟥 تفشي/حالات"}
+
+
+def test_match_with_and_without_fields():
+    index = SubscriptionIndex([
+        {"chat_id": 1},                                                  # الكل
+        {"chat_id": 2, "country": ["كينيا", "السودان"]},                 # أي دولة منها
+        {"chat_id": 3, "country": "كينيا", "disease": ["داء الكلب"]},    # الحقلين لازم
+        {"chat_id": 4, "profile": ["animal_monitor_ar"], "country": [" كينيا "]},
+        {"chat_id": 5, "country": [], "label": "🟥 تفشي/حالات"},          # الفاضي = الكل
+    ])
+    assert sorted(index.chats[i] for i in index.match({**EVENT, "profile": "main"})) == ["1", "2", "5"]
+    assert sorted(index.chats[i] for i in index.match({**EVENT, "profile": "animal_monitor_ar"})) == [
+        "1", "2", "4", "5",
+    ]
+    # حقل غائب من الحدث ما يطابق اشتراك مقيد به
+    assert [index.chats[i] for i in index.match({"disease": "داء الكلب"})] == ["1"]
+
+
+def test_route_sends_each_event_once_per_chat():
+    index = SubscriptionIndex([
+        {"chat_id": "-100", "country": ["كينيا"]},
+        {"chat_id": "-100", "disease": [EVENT["disease"]]},
+        {"chat_id": "-200", "country": ["السودان"]},
+    ])
+    other = {**EVENT, "country": "السودان", "disease": "داء الكلب"}
+    assert index.route([EVENT, other], "main") == {"-100": [EVENT], "-200": [other]}
+
+
+def test_current_reloads_after_file_changes(tmp_path):
+    path = tmp_path / "subscriptions.json"
+    assert len(subscriptions.current(str(path))) == 0
+
+    path.write_text(json.dumps([{"chat_id": 1}]), encoding="utf-8")
+    first = subscriptions.current(str(path))
+    assert first.chats == ["1"]
+    # نفس mtime: نفس الفهرس بدون إعادة بناء
+    assert subscriptions.current(str(path)) is first
+
+    st = os.stat(path)
+    path.write_text(json.dumps([{"chat_id": 1}, {"chat_id": 2, "country": ["كينيا"]}]), encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert subscriptions.current(str(path)).chats == ["1", "2"]
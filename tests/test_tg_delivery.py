@@ -0,0 +1,105 @@
+import types
+
+import pytest
+
+import http_client
+import tg_delivery
+from tg_delivery import Outbox, _split_block, pack_blocks, tg_len
+
+
+def test_pack_keeps_blocks_whole():
+    blocks = ["a" * 40, "b" * 40, "c" * 40]
+    assert pack_blocks(blocks, limit=90) == ["a" * 40 + "\n" + "b" * 40, "c" * 40]
+
+
+def test_split_block_on_lines_then_words_then_hard_cut():
+    assert _split_block("one two\nthree", 9) == ["one two", "three"]
+    assert _split_block("aaaa bbbb cccc", 9) == ["aaaa bbbb", "cccc"]
+    assert _split_block("x" * 20, 8) == ["x" * 8, "x" * 8, "x" * 4]
+
+
+def test_limit_counts_utf16_units():
+    # الإيموجي وحدتين UTF-16: 3 منها = 6 وحدات
+    assert tg_len("🐄🐄🐄") == 6
+    parts = pack_blocks(["🐄" * 5], limit=4)
+    assert parts == ["🐄🐄", "🐄🐄", "🐄"]
+    assert all(tg_len(p) <= 4 for p in parts)
+
+
+class FakeTelegram:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.sent = []
+
+    def post(self, url, json, timeout):
+        status, body = self.replies.pop(0) if self.replies else (200, {})
+        if status == 200:
+            self.sent.append((json["chat_id"], json["text"]))
+        return types.SimpleNamespace(status_code=status, ok=status == 200, json=lambda: body)
+
+
+@pytest.fixture
+def telegram(monkeypatch):
+    def install(replies):
+        fake = FakeTelegram(replies)
+        monkeypatch.setattr(http_client, "post", fake.post)
+        return fake
+
+    sleeps = []
+    monkeypatch.setattr(tg_delivery, "time", types.SimpleNamespace(sleep=sleeps.append))
+    monkeypatch.setattr(tg_delivery, "CHAT_RATE", 1e9)
+    install.sleeps = sleeps
+    return install
+
+
+def _outbox(chat_id, *texts):
+    box = Outbox()
+    box.enqueue(chat_id, texts)
+    return box
+
+
+def _too_many(after):
+    return 429, {"parameters": {"retry_after": after}}
+
+
+def test_short_429_waits_and_resends_same_message(telegram):
+    fake = telegram([_too_many(3)])
+    box = _outbox(1, "m1", "m2")
+    assert box.flush("t") == 2
+    assert fake.sent == [(1, "m1"), (1, "m2")]
+    assert telegram.sleeps == [3.0]
+    assert box.pending == []
+
+
+def test_repeated_429_stops_after_total_wait(telegram):
+    # Telegram يرد 429 كل مرة: نوقف بعد RETRY_WAIT_MAX والرسائل تبقى بالترتيب
+    fake = telegram([_too_many(20)] * 100)
+    box = _outbox(1, "m1", "m2")
+    assert box.flush("t") == 0
+    assert fake.sent == []
+    assert sum(telegram.sleeps) <= tg_delivery.RETRY_WAIT_MAX
+    assert [m["text"] for m in box.pending] == ["m1", "m2"]
+
+
+def test_long_429_keeps_queue_for_next_run(telegram):
+    telegram([(200, {}), _too_many(3600)])
+    box = _outbox(1, "m1", "m2", "m3")
+    assert box.flush("t") == 1
+    assert telegram.sleeps == []
+    assert [m["text"] for m in box.pending] == ["m2", "m3"]
+
+
+def test_rejected_message_goes_after_rest_of_queue(telegram):
+    fake = telegram([(400, {}), (200, {}), (500, {})])
+    box = _outbox(1, "bad", "ok", "later")
+    assert box.flush("t") == 1
+    assert fake.sent == [(1, "ok")]
+    # خطأ السيرفر يوقف المحادثة؛ المرفوضة تنعاد بعد الباقي
+    assert [(m["text"], m["attempts"]) for m in box.pending] == [("later", 1), ("bad", 1)]
+
+
+def test_rejected_message_dropped_after_max_attempts(telegram):
+    telegram([(400, {})])
+    box = Outbox().load([{"chat_id": 1, "text": "bad", "attempts": tg_delivery.MAX_ATTEMPTS - 1}])
+    assert box.flush("t") == 0
+    assert box.pending == []
@@ -0,0 +1,170 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import http_client
+from rate_limit import TokenBucket
+
+# =========================
+# إرسال Telegram عبر طابور
+# =========================
+# - نجمع الأخبار الكاملة (blocks) في أقل عدد رسائل ضمن حد Telegram،
+#   وما نقسم خبر إلا إذا كان هو نفسه أطول من الحد (على حدود الأسطر ثم الكلمات).
+# - 429: نقرأ retry_after وننتظر ثم نعيد نفس الرسالة، بمجموع انتظار
+#   ≤ RETRY_WAIT_MAX لكل محادثة؛ بعده الباقي يستنى التشغيل الجاي.
+# - أي رسالة ما انرسلت تبقى في الطابور (يُحفظ مع الحالة) وتنرسل أول التشغيل الجاي.
+# - كل محادثة طابور مستقل بالترتيب، والمحادثات تنرسل بالتوازي (الاشتراكات)
+#   تحت حد Telegram: محدد للبوت كامل + محدد لكل محادثة.
+
+TG_LIMIT = 4096          # Telegram يحسب بوحدات UTF-16
+RETRY_WAIT_MAX = 60      # مجموع انتظار 429 المقبول لكل محادثة داخل التشغيل
+MAX_ATTEMPTS = 5         # رسالة يرفضها Telegram (400) تنحذف بعد كذا محاولة
+BOT_RATE = 25            # رسالة/ثانية للبوت (حد Telegram ~30)
+CHAT_RATE = 1            # رسالة/ثانية لكل محادثة، مع دفعة صغيرة للتقرير الواحد
+CHAT_BURST = 3
+SEND_WORKERS = 8
+
+
+def tg_len(text):
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _cut(text, limit, sep):
+    """يقسم text على sep بحيث كل جزء ≤ limit (الجزء الأطول من الحد يرجع كما هو)."""
+    out = []
+    cur = ""
+    for piece in text.split(sep):
+        cand = f"{cur}{sep}{piece}" if cur else piece
+        if cur and tg_len(cand) > limit:
+            out.append(cur)
+            cur = piece
+        else:
+            cur = cand
+    if cur:
+        out.append(cur)
+    return out
+
+
+def _split_block(block, limit):
+    if tg_len(block) <= limit:
+        return [block]
+    parts = []
+    for line in _cut(block, limit, "\n"):
+        if tg_len(line) <= limit:
+            parts.append(line)
+            continue
+        for word_run in _cut(line, limit, " "):
+            # كلمة/رابط أطول من الحد: آخر حل قص مباشر
+            while tg_len(word_run) > limit:
+                n = limit
+                while tg_len(word_run[:n]) > limit:
+                    n -= 1
+                parts.append(word_run[:n])
+                word_run = word_run[n:]
+            if word_run:
+                parts.append(word_run)
+    return parts
+
+
+def pack_blocks(blocks, limit=TG_LIMIT):
+    messages = []
+    cur = ""
+    for block in blocks:
+        for piece in _split_block(block, limit):
+            cand = f"{cur}\n{piece}" if cur else piece
+            if cur and tg_len(cand) > limit:
+                messages.append(cur)
+                cur = piece
+            else:
+                cur = cand
+    if cur:
+        messages.append(cur)
+    return messages
+
+
+class Outbox:
+    def __init__(self):
+        self.pending = []
+        self._bot_limit = TokenBucket(BOT_RATE, burst=BOT_RATE)
+        self._chat_limits = {}
+
+    def load(self, pending):
+        self.pending = list(pending or [])
+        return self
+
+    def enqueue(self, chat_id, messages):
+        for text in messages:
+            self.pending.append({"chat_id": chat_id, "text": text, "attempts": 0})
+
+    def flush(self, bot):
+        """
+        يرسل ويرجع عدد الرسائل المرسلة. كل محادثة بالترتيب، والمحادثات بالتوازي.
+        محادثة تتوقف (بدون استثناء) عند خطأ شبكة أو 429 يتجاوز RETRY_WAIT_MAX أو خطأ سيرفر،
+        وباقيها يبقى في pending.
+        """
+        url = f"https://api.telegram.org/bot{bot}/sendMessage"
+        by_chat = {}
+        for msg in self.pending:
+            by_chat.setdefault(msg["chat_id"], []).append(msg)
+        self.pending = []
+        if len(by_chat) <= 1:
+            results = [self._flush_chat(url, q) for q in by_chat.values()]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(by_chat), SEND_WORKERS)) as pool:
+                results = list(pool.map(lambda q: self._flush_chat(url, q), by_chat.values()))
+
+        sent = 0
+        for n, left in results:
+            sent += n
+            self.pending.extend(left)
+        return sent
+
+    def _flush_chat(self, url, queue):
+        """طابور محادثة وحدة. ترجع (عدد المرسل، الباقي بالترتيب)."""
+        chat_limit = self._chat_limits.setdefault(
+            queue[0]["chat_id"], TokenBucket(CHAT_RATE, burst=CHAT_BURST)
+        )
+        retry = []
+        sent = 0
+        waited = 0.0
+        while queue:
+            msg = queue[0]
+            chat_limit.acquire()
+            self._bot_limit.acquire()
+            try:
+                r = http_client.post(
+                    url,
+                    json={"chat_id": msg["chat_id"], "text": msg["text"], "disable_web_page_preview": True},
+                    timeout=(http_client.CONNECT_TIMEOUT, 30),
+                )
+            except requests.RequestException:
+                break
+
+            if r.status_code == 429:
+                try:
+                    wait = float(r.json()["parameters"]["retry_after"])
+                except (ValueError, KeyError, TypeError):
+                    wait = 5.0
+                # Telegram ممكن يرد 429 كل مرة: بدون حد للمجموع التشغيل ما يخلص
+                if waited + wait > RETRY_WAIT_MAX:
+                    break
+                time.sleep(wait)
+                waited += wait
+                continue
+
+            queue.pop(0)
+            if r.ok:
+                sent += 1
+                continue
+
+            msg["attempts"] = msg.get("attempts", 0) + 1
+            if 400 <= r.status_code < 500:
+                # رسالة مرفوضة ما توقف الباقي؛ تنعاد التشغيل الجاي لحد MAX_ATTEMPTS
+                if msg["attempts"] < MAX_ATTEMPTS:
+                    retry.append(msg)
+                continue
+            queue.insert(0, msg)
+            break
+
+        return sent, queue + retry